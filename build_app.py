@@ -14,6 +14,8 @@ def run_pyinstaller(app_name, icon_path, dist_path, spec_path, source_path):
             '--noconsole',
             '--distpath', dist_path,
             '--specpath', spec_path,
+            # The app does not use pandas - keep it out of the bundle even if it is installed
+            '--exclude-module', 'pandas',
             source_path
         ], check=True)
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,144 @@
+"""
+Evaluate saved projects without the GUI.
+
+Usage:
+    python cyclogear/batch.py PROJECTS... [-o OUTPUT] [-f {jsonl,csv}] [-w WORKERS]
+
+PROJECTS are project .json files, directories containing them or glob patterns. One result
+record per project is written to the output as soon as the project gets evaluated.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import DesignEngine, load_project
+
+BEARINGS_SECTIONS = ['support_A', 'support_B', 'eccentrics']
+
+CSV_FIELDS = (['project', 'passed', 'dsc', 'dec', 'Ra', 'Rb', 'F', 'P', 'is_whole_shaft_designed', 'shaft_passed']
+              + [f'C_{bearing_section_id}' for bearing_section_id in BEARINGS_SECTIONS]
+              + [f'P_{bearing_section_id}' for bearing_section_id in BEARINGS_SECTIONS]
+              + ['error'])
+
+_engine = None
+
+def find_projects(paths):
+    """
+    Collect project files from the given paths.
+
+    Args:
+        paths (list): Project files, directories or glob patterns.
+    Returns:
+        (list): Sorted paths of project files.
+    """
+    projects = set()
+    for path in paths:
+        if os.path.isdir(path):
+            projects.update(glob.glob(os.path.join(path, '*.json')))
+        else:
+            projects.update(file_path for file_path in glob.glob(path) if os.path.isfile(file_path))
+    return sorted(projects)
+
+def evaluate_project_file(file_path):
+    """
+    Evaluate single project file - runs in the worker process.
+
+    Args:
+        file_path (str): Path to the project .json file.
+    Returns:
+        (dict): Result record of the project.
+    """
+    global _engine
+    if _engine is None:
+        _engine = DesignEngine()
+
+    record = {'project': file_path}
+    try:
+        results = _engine.evaluate(load_project(file_path))
+    except Exception as e:
+        record.update({'passed': False, 'error': f'{type(e).__name__}: {e}'})
+        return record
+
+    record.update({key: results[key] for key in ['dsc', 'dec', 'Ra', 'Rb', 'F', 'P', 'is_whole_shaft_designed']})
+    record['passed'] = results['checks']['passed']
+    record['shaft_passed'] = results['checks']['shaft']
+    for bearing_section_id, bearing_results in results['Bearings'].items():
+        record[f'C_{bearing_section_id}'] = bearing_results['C']
+        record[f'P_{bearing_section_id}'] = bearing_results['P']
+    return record
+
+class RecordWriter:
+    """
+    Write result records to JSONL or CSV stream.
+    """
+    def __init__(self, stream, format):
+        self._stream = stream
+        self._format = format
+        if format == 'csv':
+            self._writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, restval='', extrasaction='ignore')
+            self._writer.writeheader()
+
+    def write(self, record):
+        if self._format == 'csv':
+            self._writer.writerow(record)
+        else:
+            self._stream.write(json.dumps(record) + '\n')
+        # Flush every record so the results can be followed while the batch runs
+        self._stream.flush()
+
+def run_batch(projects, writer, workers=None):
+    """
+    Evaluate projects in parallel and write their records as they complete.
+
+    Args:
+        projects (list): Paths of the project files.
+        writer (RecordWriter): Writer of the result records.
+        workers (int): Number of worker processes - all CPUs by default.
+    Returns:
+        (tuple): (int, int) number of evaluated and passed projects.
+    """
+    evaluated = passed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(evaluate_project_file, file_path) for file_path in projects]
+        for future in as_completed(futures):
+            record = future.result()
+            writer.write(record)
+            evaluated += 1
+            passed += bool(record['passed'])
+    return evaluated, passed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cyclogear-batch', description='Evaluate saved CycloGear projects without the GUI.')
+    parser.add_argument('projects', nargs='+', help='project .json files, directories or glob patterns')
+    parser.add_argument('-o', '--output', help='output file - standard output by default')
+    parser.add_argument('-f', '--format', choices=['jsonl', 'csv'], help='output format - deduced from the output file extension, jsonl by default')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes - all CPUs by default')
+    args = parser.parse_args(argv)
+
+    projects = find_projects(args.projects)
+    if not projects:
+        parser.error('no project files found')
+
+    format = args.format or ('csv' if args.output and args.output.endswith('.csv') else 'jsonl')
+    stream = open(args.output, 'w', newline='') if args.output else sys.stdout
+
+    start_time = time.perf_counter()
+    try:
+        evaluated, passed = run_batch(projects, RecordWriter(stream, format), args.workers)
+    finally:
+        if args.output:
+            stream.close()
+    elapsed_time = time.perf_counter() - start_time
+
+    print(f'Evaluated {evaluated} projects in {elapsed_time:.2f} s ({evaluated / elapsed_time:.1f} projects/s), '
+          f'{passed} passed, {evaluated - passed} failed', file=sys.stderr)
+
+    return 0 if passed == evaluated else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Benchmark the calculation hot paths on synthetic input mechanisms.
+
+Usage:
+    python cyclogear/benchmark.py [-k PATTERN] [-r REPEAT] [--save FILE] [--compare FILE] [--threshold RATIO]
+
+Every benchmark gets run repeatedly - the median and minimum time per call are reported. The results
+can be saved as a baseline and compared with a saved one - the exit code is non-zero if the minimum
+time of any of the benchmarks got longer than the baseline one by more than the threshold.
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+from input_mechanism.model.input_mechanism_calculator import InputMechanismCalculator
+from input_mechanism.utils.dict_utils import extract_data, fetch_data_subset
+
+from shaft_designer.model.functions_calculator import FunctionsCalculator
+from shaft_designer.model.shaft_calculator import ShaftCalculator
+
+from config import DATA_DIR_NAME, dependencies_path
+
+ECCENTRICS_NUMBERS = [1, 2, 3, 4]
+SHAFT_STEPS_NUMBERS = [2, 8, 20]
+LONG_SHAFT_LENGTH = 3000
+# DbHandler queries of the catalogues, as the components issue them
+DB_QUERIES = {
+    'fetch_materials': lambda db_handler: db_handler.fetch_materials(),
+    'fetch_bearing_types': lambda db_handler: db_handler.fetch_bearing_types('podporowe'),
+    'fetch_bearings': lambda db_handler: db_handler.fetch_bearings('podporowe', 'kulkowe'),
+    'fetch_bearings_constrained': lambda db_handler: db_handler.fetch_bearings('centralne', 'walcowe', 20, 10),
+    'fetch_rolling_elements': lambda db_handler: db_handler.fetch_rolling_elements('kulkowe'),
+    'fetch_rolling_elements_nearest': lambda db_handler: db_handler.fetch_rolling_elements('walcowe', 5.1),
+}
+
+def make_mechanism_data(eccentrics_number=2, length=300):
+    """
+    Create input mechanism data of a typical cycloidal drive - a 300 mm shaft made of C45 steel
+    with the eccentrics in the middle between the supports.
+
+    Args:
+        eccentrics_number (int): Number of the eccentrics.
+        length (float): Shaft length [mm] - the supports are placed at 1/15 of it from the shaft ends.
+    Returns:
+        (dict): Input mechanism data.
+    """
+    calculator = InputMechanismCalculator()
+    data = calculator.get_data()
+
+    data['L'][0] = length
+    data['LA'][0] = length / 15
+    data['LB'][0] = length - length / 15
+    data['n'][0] = eccentrics_number
+    data['Materiał'] = {'name': ['C45', ''], 'r_m': [600, 'MPa'], 'r_e': [340, 'MPa'], 'z_gj': [460, 'MPa'], 'z_go': [250, 'MPa'],
+                        'z_sj': [300, 'MPa'], 'z_so': [150, 'MPa'], 'e': [210000, 'MPa'], 'g': [80750, 'MPa'], 'ro': [7860, 'kg/m^3']}
+    data['xz'][0] = 2
+    data['qdop'][0] = 0.0044
+    data['tetadop'][0] = 0.001
+    data['fdop'][0] = 0.05
+
+    # Eccentrics spaced by x between the wheels, centered between the supports
+    pitch = data['x'][0] + data['B'][0]
+    data['L1'][0] = length / 2 - (eccentrics_number - 1) * pitch / 2
+    calculator.set_initial_data()
+    for idx, position in enumerate(data['Lc'].values()):
+        position[0] = data['L1'][0] + (idx + 1) * pitch
+
+    return data
+
+def make_shaft_steps(shaft_attributes, steps_number):
+    """
+    Create shaft steps covering the whole shaft - the eccentrics steps, single steps between them
+    and steps_number steps before and after them, getting thinner towards the shaft ends.
+
+    Args:
+        shaft_attributes (dict): Shaft initial attributes - see FunctionsCalculator.get_shaft_initial_attributes.
+        steps_number (int): Number of steps before and after the eccentrics together.
+    Returns:
+        (dict): Shaft sections in the ShaftCalculator format.
+        (list): Shaft steps in the FunctionsCalculator format.
+    """
+    Li, B, e, L = shaft_attributes['Li'], shaft_attributes['B'], shaft_attributes['e'], shaft_attributes['L']
+    ds, de = shaft_attributes['ds'], shaft_attributes['de']
+
+    shaft_steps = [{'z': position - B / 2, 'l': B, 'd': de + 4, 'e': e * (-1)**idx} for idx, position in enumerate(Li)]
+    shaft_steps += [{'z': Li[idx] + B / 2, 'l': Li[idx + 1] - Li[idx] - B, 'd': ds + 6, 'e': 0} for idx in range(len(Li) - 1)]
+
+    sections = {'Mimośrody': {idx: {'l': B, 'd': de + 4} for idx in range(len(Li))}}
+    if len(Li) >= 2:
+        sections['Pomiędzy Mimośrodami'] = {0: {'l': Li[1] - Li[0] - B, 'd': ds + 6}}
+
+    steps_before = steps_number // 2
+    for section_name, start, end, steps in [('Przed Mimośrodami', 0, Li[0] - B / 2, steps_before),
+                                            ('Za Mimośrodami', Li[-1] + B / 2, L, steps_number - steps_before)]:
+        # Lengths rounded to 0.5 mm like the entered ones - the shaft is designed only if they sum up to its length exactly
+        length = math.floor((end - start) / steps * 2) / 2
+        lengths = [length] * (steps - 1) + [end - start - length * (steps - 1)]
+        # Subsections are numbered from the eccentrics
+        diameters = [ds + 4 * (steps - idx) / steps for idx in range(steps)]
+        sections[section_name] = {idx: {'l': length, 'd': diameter} for idx, (length, diameter) in enumerate(zip(lengths, diameters))}
+        if section_name == 'Przed Mimośrodami':
+            lengths.reverse()
+            diameters.reverse()
+        step_start = start
+        for length, diameter in zip(lengths, diameters):
+            shaft_steps.append({'z': step_start, 'l': length, 'd': diameter, 'e': 0})
+            step_start += length
+
+    shaft_steps.sort(key=lambda step: step['z'])
+
+    return sections, shaft_steps
+
+def make_bearings_attributes(shaft_attributes):
+    return {'support_A': {'Dw': shaft_attributes['ds'] + 2, 'Dz': 62, 'B': 16, 'e': 0},
+            'support_B': {'Dw': shaft_attributes['ds'] + 2, 'Dz': 62, 'B': 16, 'e': 0},
+            'eccentrics': {'Dw': shaft_attributes['de'] + 4, 'Dz': 68, 'B': shaft_attributes['B'], 'e': shaft_attributes['e']}}
+
+def get_data_paths(data, path=[]):
+    # Paths of all the values of the data - like the ones the tabs exchange with the component
+    paths = []
+    for key, value in data.items():
+        if isinstance(value, dict):
+            paths += get_data_paths(value, path + [key])
+        else:
+            paths.append(path + [key])
+    return paths
+
+def get_calculated_functions_calculator(data):
+    functions_calculator = FunctionsCalculator()
+    functions_calculator.calculate_initial_functions_and_attributes(copy.deepcopy(data))
+    return functions_calculator
+
+def get_shaft_calculator(shaft_attributes, sections):
+    shaft_calculator = ShaftCalculator()
+    shaft_calculator.set_data(copy.deepcopy(shaft_attributes))
+    for section_name, section in sections.items():
+        for subsection_number, subsection in section.items():
+            shaft_calculator.calculate_shaft_sections((section_name, subsection_number, dict(subsection), None))
+    return shaft_calculator
+
+def collect_benchmarks():
+    """
+    Create the benchmarks with their fixtures.
+
+    Returns:
+        (dict): name: function to benchmark.
+    """
+    benchmarks = {}
+
+    for eccentrics_number in ECCENTRICS_NUMBERS:
+        data = make_mechanism_data(eccentrics_number)
+
+        def calculate_initial_functions(data=data):
+            FunctionsCalculator().calculate_initial_functions_and_attributes(data)
+        benchmarks[f'functions.initial[n={eccentrics_number}]'] = calculate_initial_functions
+
+        functions_calculator = get_calculated_functions_calculator(data)
+        shaft_attributes = functions_calculator.get_shaft_initial_attributes()
+        for steps_number in SHAFT_STEPS_NUMBERS:
+            _, shaft_steps = make_shaft_steps(shaft_attributes, steps_number)
+            benchmarks[f'functions.remaining[n={eccentrics_number},steps={steps_number}]'] = (
+                lambda functions_calculator=functions_calculator, shaft_steps=shaft_steps: functions_calculator.calculate_remaining_functions(shaft_steps))
+
+    # Adaptive sampling against the uniform one on a long shaft - the uniform one calculates the functions every 0.1 mm
+    data = make_mechanism_data(2, LONG_SHAFT_LENGTH)
+    _, shaft_steps = make_shaft_steps(get_calculated_functions_calculator(data).get_shaft_initial_attributes(), 8)
+    for sampling in ('uniform', 'adaptive'):
+        def calculate_initial_functions(data=data, sampling=sampling):
+            FunctionsCalculator(sampling).calculate_initial_functions_and_attributes(data)
+        benchmarks[f'functions.initial[L={LONG_SHAFT_LENGTH},sampling={sampling}]'] = calculate_initial_functions
+
+        functions_calculator = FunctionsCalculator(sampling)
+        functions_calculator.calculate_initial_functions_and_attributes(copy.deepcopy(data))
+        benchmarks[f'functions.remaining[L={LONG_SHAFT_LENGTH},sampling={sampling},steps=8]'] = (
+            lambda functions_calculator=functions_calculator: functions_calculator.calculate_remaining_functions(shaft_steps))
+
+    # Shaft drawing - editing one subsection of a fully designed shaft
+    data = make_mechanism_data(2)
+    shaft_attributes = get_calculated_functions_calculator(data).get_shaft_initial_attributes()
+    sections, _ = make_shaft_steps(shaft_attributes, 8)
+    shaft_calculator = get_shaft_calculator(shaft_attributes, sections)
+    subsection = ('Za Mimośrodami', 0, dict(sections['Za Mimośrodami'][0]), None)
+    current_subsections = {section_name: list(section) for section_name, section in sections.items() if section_name != 'Mimośrody'}
+    bearings_attributes = make_bearings_attributes(shaft_attributes)
+
+    benchmarks['shaft.calculate_shaft_sections'] = lambda: shaft_calculator.calculate_shaft_sections(subsection)
+    benchmarks['shaft.calculate_limits'] = lambda: shaft_calculator.calculate_limits(current_subsections)
+    benchmarks['shaft.calculate_bearings'] = lambda: shaft_calculator.calculate_bearings(copy.copy(bearings_attributes))
+
+    # Exchange of the data between the tabs and the component
+    paths = get_data_paths(data)
+    subset = extract_data(data, paths)
+    target = copy.deepcopy(data)
+    benchmarks['dict_utils.extract_data'] = lambda: extract_data(data, paths)
+    benchmarks['dict_utils.fetch_data_subset'] = lambda: fetch_data_subset(target, subset)
+
+    benchmarks.update(collect_db_benchmarks())
+
+    return benchmarks
+
+def collect_db_benchmarks():
+    # The database gets built with db_creator.py - skip the queries if it is missing
+    if not os.path.exists(dependencies_path(f'{DATA_DIR_NAME}//components.db')):
+        sys.stderr.write("Warning: the components database does not exist - DbHandler benchmarks skipped.\n")
+        return {}
+
+    from db_handler.model.db_handler import DbHandler
+
+    db_handler = DbHandler()
+    benchmarks = {}
+    for name, query in DB_QUERIES.items():
+        def run_query(query=query):
+            # Measure the query itself, not the results cache
+            db_handler.clear_cache()
+            query(db_handler)
+        benchmarks[f'db.{name}'] = run_query
+        benchmarks[f'db.{name}[cached]'] = lambda query=query: query(db_handler)
+    return benchmarks
+
+def run_benchmark(function, repeat):
+    """
+    Time the function.
+
+    Args:
+        function (callable): Function to benchmark.
+        repeat (int): Number of measurements.
+    Returns:
+        (dict): Median and minimum time per call [ms] and number of calls per measurement.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [time / number * 1000 for time in timer.repeat(repeat=repeat, number=number)]
+    return {'median': statistics.median(times), 'min': min(times), 'number': number}
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Compare the minimum times with the baseline - they are the least affected by the other processes.
+
+    Args:
+        results (dict): Benchmarks results.
+        baseline (dict): Saved benchmarks results.
+        threshold (float): Allowed relative slowdown.
+    Returns:
+        (dict): name: ratio of the minimum time to the baseline one.
+        (list): Names of the benchmarks slower than the baseline by more than the threshold.
+    """
+    ratios = {}
+    regressions = []
+    for name, result in results.items():
+        if name in baseline:
+            ratios[name] = result['min'] / baseline[name]['min']
+            if ratios[name] > 1 + threshold:
+                regressions.append(name)
+    return ratios, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cyclogear-benchmark', description='Benchmark the CycloGear calculation hot paths.')
+    parser.add_argument('-k', '--keyword', help='run only the benchmarks which names contain the keyword')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='number of measurements of every benchmark')
+    parser.add_argument('--save', metavar='FILE', help='save the results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='FILE', help='compare the results with a saved baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown against the baseline (default 0.25)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)['results']
+
+    benchmarks = collect_benchmarks()
+    if args.keyword:
+        benchmarks = {name: function for name, function in benchmarks.items() if args.keyword in name}
+
+    results = {}
+    name_width = max(map(len, benchmarks), default=0)
+    for name, function in benchmarks.items():
+        results[name] = run_benchmark(function, max(args.repeat, 1))
+        line = f"{name:<{name_width}} {results[name]['median']:>10.4f} ms {results[name]['min']:>10.4f} ms (min)"
+        if baseline and name in baseline:
+            line += f" {results[name]['min'] / baseline[name]['min']:>7.2f}x baseline"
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'results': results}, file, indent=2)
+            file.write('\n')
+
+    if baseline:
+        ratios, regressions = compare_with_baseline(results, baseline, args.threshold)
+        for name in regressions:
+            sys.stderr.write(f"Regression: {name} is {ratios[name]:.2f}x slower than the baseline\n")
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
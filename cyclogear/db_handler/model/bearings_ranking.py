@@ -0,0 +1,89 @@
+import numpy as np
+
+class BearingsRanking:
+    '''
+    Rank the whole bearings catalogue of a bearing type at once.
+
+    The catalogue gets loaded into arrays once - every ranking evaluates the load capacity margin, life,
+    rotational speed margin and power loss of all the bearings with array operations.
+    '''
+    SORT_KEYS = ['P', 'margin', 'Lh', 'n_margin', 'd_in']
+
+    def __init__(self, keys, rows, bearing_type, support_type):
+        '''
+        Args:
+            keys (list): Catalogue columns names.
+            rows (list): Catalogue rows.
+            bearing_type (str): Type of the bearings.
+            support_type (str): Mounting type of the bearings.
+        '''
+        self._keys = keys
+        self._rows = rows
+        self._support_type = support_type
+        self._columns = {key: np.array([row[idx] for row in rows], dtype=float) for idx, key in enumerate(keys) if key != 'designation'}
+        self._p = 1 / 3 if bearing_type == 'kulkowe' else 3 / 10
+
+    def _calculate_attributes(self, F, nwe, Lh, fd, ft, f, w0, e, rw1):
+        c = self._columns['c']
+        d_in = self._columns['d_in'] * 0.001
+        d_out = self._columns['d_out'] * 0.001
+
+        # Required load capacity - BearingsTabCalculator.calculate_bearing_load_capacity
+        l = 60 * Lh * nwe / np.power(10, 6)
+        C = np.abs(F) * np.power(l, self._p) * ft / fd / 1000 # [kN]
+
+        # Life of every bearing under the load - the capacity formula solved for Lh
+        life = np.full(len(c), np.inf) if F == 0 else np.power(c * fd / (np.abs(F) * ft / 1000), 1 / self._p) * np.power(10, 6) / (60 * nwe)
+
+        # Power loss - PowerLossTabCalculator.calculate_bearing_power_loss with the rolling elements
+        # diameter estimated like in InputMechanismCalculator.calculate_bearings_attributes
+        dw = 0.25 * (d_out - d_in)
+        S = 0.15 * (d_out - d_in) if self._support_type == 'centralne' else dw / 2
+        P = f * w0 * (1 + (d_in + 2 * S) / dw) * (1 + e * 0.001 / (rw1 * 0.001)) * 4 * np.abs(F) / np.pi
+
+        return {
+            'C': np.full(len(c), C),
+            'margin': c / C - 1 if C else np.full(len(c), np.inf),
+            'Lh': life,
+            'n_margin': self._columns['n_max'] / nwe - 1,
+            'P': P,
+            'd_in': self._columns['d_in'],
+        }
+
+    def rank(self, conditions, min_d_in=None, sort_by='P', page=0, page_size=20, feasible_only=True):
+        '''
+        Rank the bearings.
+
+        Args:
+            conditions (dict): 'F' [N], 'nwe' [obr/min], 'Lh' [h], 'fd', 'ft', 'f' [m], 'w0' [rad/s], 'e' [mm], 'rw1' [mm].
+            min_d_in (float): Minimal inner diameter of the bearing [mm].
+            sort_by (str): Attribute to sort by - one of SORT_KEYS. Margins and life are sorted descending, the rest ascending.
+            page (int): Number of the page of the ranking.
+            page_size (int): Number of bearings on a page.
+            feasible_only (bool): Skip bearings that do not carry the load, exceed n_max or do not fit the shaft.
+        Returns:
+            (tuple): (list, list, int) - keys of the ranking rows, ranking rows on the page and total number of ranked bearings.
+        '''
+        if sort_by not in self.SORT_KEYS:
+            raise ValueError(f'Unknown sort key: {sort_by}')
+
+        attributes = self._calculate_attributes(**conditions)
+
+        is_selected = np.ones(len(self._rows), dtype=bool)
+        if feasible_only:
+            is_selected &= (attributes['margin'] >= 0) & (attributes['n_margin'] >= 0)
+            if min_d_in is not None:
+                is_selected &= self._columns['d_in'] >= min_d_in
+        indices = np.flatnonzero(is_selected)
+
+        sort_values = attributes[sort_by][indices]
+        if sort_by in ['margin', 'Lh', 'n_margin']:
+            sort_values = -sort_values
+        indices = indices[np.argsort(sort_values, kind='stable')]
+
+        page_indices = indices[page * page_size:(page + 1) * page_size]
+        ranking_keys = ['C_req', 'margin', 'Lh', 'n_margin', 'P']
+        rows = [list(self._rows[idx]) + [float(attributes['C'][idx]), float(attributes['margin'][idx]), float(attributes['Lh'][idx]),
+                                          float(attributes['n_margin'][idx]), float(attributes['P'][idx])] for idx in page_indices]
+
+        return self._keys + ranking_keys, rows, len(indices)
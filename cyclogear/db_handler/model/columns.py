@@ -0,0 +1,66 @@
+'''
+Metadata of the catalogue columns - shared by DbHandler, which labels the fetched columns with it, and DbCreator,
+which converts the csv files values with it.
+'''
+from collections import namedtuple
+
+# Header and unit displayed in the items view (unit None for columns without a unit) and type of the values
+Column = namedtuple('Column', ['header', 'unit', 'type'])
+
+BEARINGS_COLUMNS = {
+    'designation': Column('kod', '-', str),
+    'd_in': Column('D<sub>w</sub>', 'mm', float),
+    'd_out': Column('D<sub>z</sub>', 'mm', float),
+    'e': Column('E', 'mm', float),
+    'b': Column('B', 'mm', float),
+    'c': Column('C', 'MPa', float),
+    'c_0': Column('C<sub>0</sub>', 'MPa', float),
+    'n_max': Column('n<sub>max</sub>', 'obr/min', float),
+}
+
+# Attributes of the bearings calculated by BearingsRanking
+BEARINGS_RANKING_COLUMNS = {
+    **BEARINGS_COLUMNS,
+    'C_req': Column('C<sub>wym</sub>', 'kN', float),
+    'margin': Column('Zapas C', '-', float),
+    'Lh': Column('L<sub>h</sub>', 'h', float),
+    'n_margin': Column('Zapas n', '-', float),
+    'P': Column('P', 'W', float),
+}
+
+BEARING_TYPES_COLUMNS = {
+    'name': Column('Rodzaj łożyska', None, str),
+}
+
+ROLLING_ELEMENTS_COLUMNS = {
+    'd': Column('D', 'mm', float),
+}
+
+MATERIALS_COLUMNS = {
+    'name': Column('kod', '-', str),
+    'r_m': Column('R<sub>m</sub>', 'MPa', int),
+    'r_e': Column('R<sub>e</sub>', 'MPa', int),
+    'z_gj': Column('Z<sub>gj</sub>', 'MPa', int),
+    'z_go': Column('Z<sub>go</sub>', 'MPa', int),
+    'z_sj': Column('Z<sub>sj</sub>', 'MPa', int),
+    'z_so': Column('Z<sub>so</sub>', 'MPa', int),
+    'e': Column('E', 'MPa', int),
+    'g': Column('G', 'MPa', int),
+    'ro': Column('ρ', 'kg/m<sup>3</sup>', int),
+}
+
+def get_headers(columns, keys):
+    '''
+    Get the headers of the columns combined with their units for display.
+
+    Args:
+        columns (dict): Metadata of the table columns.
+        keys (list): Names of the fetched columns.
+    Returns:
+        (list): Headers of the columns.
+    '''
+    headers = []
+    for key in keys:
+        column = columns[key]
+        headers.append(column.header if column.unit is None else column.header + f'<br><small>[{column.unit}]</small>')
+    return headers
@@ -1,6 +1,11 @@
 import sys, os
+import csv
+import time
+import itertools
+import glob
+import hashlib
+import argparse
 import sqlite3
-import pandas as pd
 
 # Function to determine if we're running as a PyInstaller bundle
 def is_frozen():
@@ -28,42 +33,212 @@ if config_dir not in sys.path:
     sys.path.append(config_dir)
 
 from config import DATA_PATH, DATA_DIR_NAME, dependencies_path
+from queries import SCHEMA_VERSION, SCHEMA_VERSION_QUERY
+from columns import BEARINGS_COLUMNS, ROLLING_ELEMENTS_COLUMNS, MATERIALS_COLUMNS
+
+# Catalogue csv files are named: <component>-<table>[-<mounting type>]-<type>.csv
+COMPONENT_PREFIX = 'wal_czynny'
+
+MOUNTING_TYPES = ['podporowe', 'centralne']
+ROLLING_ELEMENT_TYPES = ['kulki', 'wałeczki', 'igiełki']
+BEARING_TYPES = [
+    ('kulkowe', 1, 1), # kulki, podporowe
+    ('walcowe', 2, 1), # wałeczki, podporowe
+    ('walcowe', 2, 2), # wałeczki, centralne
+    ('igiełkowe', 3, 2)  # igiełki, centralne
+]
+
+# Number of rows of the catalogue csv files parsed and inserted at once
+CHUNK_SIZE = 10000
+
+def to_file_name(name):
+    '''
+    Get the name used in the csv files names - without Polish characters.
+    '''
+    return name.translate(str.maketrans('ąćęłńóśźż', 'acelnoszz'))
+
+def get_source(file):
+    '''
+    Get the destination of the csv file from its name.
+
+    Args:
+        file (str): Path of the csv file.
+    Returns:
+        (tuple): (str, tuple) - destination table and arguments of its add_ method or None if the name is not recognized.
+    '''
+    name_parts = os.path.splitext(os.path.basename(file))[0].split('-')
+    if name_parts[0] != COMPONENT_PREFIX:
+        return None
+
+    if name_parts[1:] == ['materialy']:
+        return 'Materials', ()
+
+    if len(name_parts) == 3 and name_parts[1] == 'elementy_toczne':
+        for idx, rolling_element_type in enumerate(ROLLING_ELEMENT_TYPES):
+            if to_file_name(rolling_element_type) == name_parts[2]:
+                return 'RollingElements', (idx + 1,)
+
+    if len(name_parts) == 4 and name_parts[1] == 'lozyska':
+        for idx, (bearing_type, rolling_element_type_id, mounting_type_id) in enumerate(BEARING_TYPES):
+            mounting_type = MOUNTING_TYPES[mounting_type_id - 1]
+            if [mounting_type, to_file_name(bearing_type)] == name_parts[2:]:
+                return 'Bearings', (idx + 1, rolling_element_type_id, mounting_type == 'centralne')
+
+    return None
+
+def get_file_hash(file):
+    sha256 = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def to_number(value):
+    '''
+    Convert the catalogue csv value with a decimal comma to float - empty values to None.
+    '''
+    return float(value.replace(',', '.')) if value.strip() else None
+
+def to_integer(value):
+    '''
+    Convert the catalogue csv integer value to int - empty values to None.
+    '''
+    return int(value) if value.strip() else None
+
+# Functions converting the csv values to the types of the columns
+TYPE_CONVERTERS = {str: str, int: to_integer, float: to_number}
+
+def get_converters(columns):
+    '''
+    Get the functions converting the csv values of the columns to the types of the columns.
+    '''
+    return {key: TYPE_CONVERTERS[column.type] for key, column in columns.items()}
+
+def convert_column(values, convert):
+    if convert is to_number:
+        try:
+            # Replace the decimal commas of the whole column at once
+            return list(map(float, ';'.join(values).replace(',', '.').split(';')))
+        except ValueError:
+            # Empty values
+            pass
+    return list(map(convert, values))
+
+def read_csv_chunks(file, columns, converters=None, chunk_size=CHUNK_SIZE):
+    '''
+    Read the catalogue csv file in chunks of rows without loading the whole file - the second row holds the units.
+
+    Args:
+        file (str): Path of the csv file.
+        columns (list): Names of the columns to read.
+        converters (dict): Functions converting the values of the columns - to_number by default.
+        chunk_size (int): Number of rows in a chunk.
+    Yields:
+        (tuple): (list, int, int) - rows of the chunk as tuples of the columns values, bytes of the file read so far and size of the file.
+    '''
+    converters = converters or {}
+    total_bytes = os.path.getsize(file)
+
+    with open(file, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter=';')
+        header = [name.strip() for name in next(reader)]
+        next(reader, None)
+
+        missing_columns = [column for column in columns if column not in header]
+        if missing_columns:
+            raise ValueError(f"{os.path.basename(file)} lacks the columns: {', '.join(missing_columns)}")
+
+        indices = [header.index(column) for column in columns]
+        column_converters = [converters.get(column, to_number) for column in columns]
+
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+
+            # Skip the blank lines
+            chunk = [row for row in rows if row]
+            if not chunk:
+                continue
+
+            # Convert the chunk column by column
+            values = [convert_column([row[idx] for row in chunk], convert) for idx, convert in zip(indices, column_converters)]
+
+            # The position of the buffer of the file - tell() is not available while the file is iterated
+            yield list(zip(*values)), min(f.buffer.tell(), total_bytes), total_bytes
 
 class DbCreator:
     '''
     This class creates a database of components which data
     is used in the application.
+
+    The whole database gets built in a single transaction of one connection - it is
+    committed with finish(). A new database is built next to the current one and replaces
+    it when finished, so the current database stays available during the build. In the
+    incremental mode the current database gets updated in place - only with the csv files
+    that changed since they were imported. The catalogues are streamed into the database in chunks,
+    so the memory use does not depend on the csv files sizes.
     '''
-    def __init__(self): 
-        self._create_database()
-        self._create_tables()
+    def __init__(self, incremental=False, chunk_size=CHUNK_SIZE, progress_callback=None, database_path=None):
+        '''
+        Args:
+            incremental (bool): Update the current database with the changed csv files only.
+            chunk_size (int): Number of rows of the catalogues parsed and inserted at once.
+            progress_callback (callable): Called after every chunk with the csv file path, number of rows
+                                          imported from it so far, bytes of it read so far and its size.
+            database_path (str): Path of the built database - components.db of the data directory by default.
+        '''
+        self._create_database(incremental, database_path)
+
+        self._conn = sqlite3.connect(self._build_database_path)
+        if self.is_rebuilt:
+            # The new database gets rebuilt from scratch on failure - skip the journal and syncing during build
+            self._conn.execute('PRAGMA journal_mode = OFF')
+            self._conn.execute('PRAGMA synchronous = OFF')
+
+            self._create_tables()
+
+        self._chunk_size = chunk_size
+        self._progress_callback = progress_callback
+        self._import_report = []
 
-    def _create_database(self):
+    def _get_schema_version(self):
+        conn = sqlite3.connect(self._database_abs_path)
+        try:
+            return conn.execute(SCHEMA_VERSION_QUERY).fetchone()[0]
+        except (sqlite3.Error, TypeError):
+            return None
+        finally:
+            conn.close()
+
+    def _create_database(self, incremental, database_path):
         # Set the destination directory absoulte path where csv and database files should be stored
         if not os.path.exists(DATA_PATH):
             sys.stderr.write(f"Error: {DATA_PATH} does not exist.\n")
             sys.exit(1)
 
         # Set the absoulte path of the created database
-        self._database_abs_path = dependencies_path(f'{DATA_DIR_NAME}//components.db')
+        self._database_abs_path = os.path.abspath(database_path) if database_path else dependencies_path(f'{DATA_DIR_NAME}//components.db')
 
-        # If database already exists, remove it
-        if os.path.exists(self._database_abs_path):
-            os.remove(self._database_abs_path)
+        # Update the database in place only if it has the current schema
+        self.is_rebuilt = not (incremental and os.path.exists(self._database_abs_path) and self._get_schema_version() == SCHEMA_VERSION)
 
-        # Create new database
-        conn = sqlite3.connect(self._database_abs_path)
-        conn.close
+        if self.is_rebuilt:
+            # Build new database next to the current one, remove leftovers of a failed build
+            self._build_database_path = self._database_abs_path + '.tmp'
+            if os.path.exists(self._build_database_path):
+                os.remove(self._build_database_path)
+        else:
+            self._build_database_path = self._database_abs_path
 
     def _create_tables(self):
-        conn = sqlite3.connect(self._database_abs_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
 
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS Materials (
                 id INTEGER PRIMARY KEY,
                 name TEXT NOT NULL,
-                r_m TEXT NOT NULL,
+                r_m INTEGER NOT NULL,
                 r_e INTEGER NOT NULL,
                 z_gj INTEGER NOT NULL,
                 z_go INTEGER NOT NULL,
@@ -127,135 +302,219 @@ class DbCreator:
             )
         ''')
 
-        conn.commit()
-        conn.close()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS SchemaVersion (
+                version INTEGER NOT NULL
+            )
+        ''')
 
-    def add_materials(self, file):
-        conn = sqlite3.connect(self._database_abs_path)
-        df = pd.read_csv(file, skiprows=[1], delimiter=';', decimal=',')
-        df.index.name = 'id'
-        df.to_sql('Materials', conn, if_exists='replace', index=True)
+        # Csv files the tables were imported from
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS SourceFiles (
+                file TEXT PRIMARY KEY,
+                hash TEXT NOT NULL
+            )
+        ''')
 
-        conn.commit()
-        conn.close()
+        cursor.execute('INSERT INTO SchemaVersion (version) VALUES (?)', (SCHEMA_VERSION,))
 
-    def add_mounting_types(self):
-        conn = sqlite3.connect(self._database_abs_path)
-        cursor = conn.cursor()
+        # Bearing types denormalized with their mounting type names - the queries look the
+        # bearing type up by names without joining the types tables
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS BearingTypesLookup (
+                name TEXT NOT NULL,
+                mounting_type TEXT NOT NULL,
+                bearing_type_id INTEGER NOT NULL,
+                rolling_element_type_id INTEGER NOT NULL,
+                PRIMARY KEY (name, mounting_type)
+            ) WITHOUT ROWID
+        ''')
 
-        mounting_types = [
-            ('podporowe',),
-            ('centralne',)
-        ]
+    def _create_indexes(self):
+        # Indexes get created after the import - building them at once is faster than updating them row by row
+        cursor = self._conn.cursor()
 
-        cursor.executemany('''
-            INSERT INTO MountingTypes (name)
-            VALUES (?)
-        ''', mounting_types)
+        # Indexes covering the catalogue queries filtering by type and ranges of dimensions
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS BearingsTypeDimensions
+            ON Bearings (bearing_type_id, d_in, c_0, c)
+        ''')
 
-        conn.commit()
-        conn.close()
-    
-    def add_rolling_element_types(self):
-        conn = sqlite3.connect(self._database_abs_path)
-        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS RollingElementsTypeDiameter
+            ON RollingElements (rolling_element_type_id, d)
+        ''')
 
-        rolling_element_types = [
-            ('kulki',),
-            ('wałeczki',),
-            ('igiełki',)
-        ]
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS BearingTypesLookupMountingType
+            ON BearingTypesLookup (mounting_type, bearing_type_id)
+        ''')
 
-        cursor.executemany('''
-            INSERT INTO RollingElementTypes (name)
-            VALUES (?)
-        ''', rolling_element_types)
+    def _insert_rows(self, table, columns, rows):
+        start_time = time.perf_counter()
 
-        conn.commit()
-        conn.close()
+        self._conn.executemany(self._get_insert_query(table, columns), rows)
 
-    def add_bearing_types(self):
-        conn = sqlite3.connect(self._database_abs_path)
-        cursor = conn.cursor()
-
-        bearing_types = [
-            ('kulkowe', 1, 1), # kulki, podporowe
-            ('walcowe', 2, 1), # wałeczki, podporowe
-            ('walcowe', 2, 2), # wałeczki, centralne
-            ('igiełkowe', 3, 2)  # igiełki, centralne
-        ]
-
-        cursor.executemany('''
-        INSERT INTO BearingTypes (name, rolling_element_type_id, mounting_type_id)
-        VALUES (?, ?, ?)
-        ''', bearing_types)
-        
-        conn.commit()
-        conn.close()
+        self._import_report.append((table, len(rows), time.perf_counter() - start_time))
 
-    def add_rolling_elements(self, file, rolling_element_type):
-        conn = sqlite3.connect(self._database_abs_path)
-        cursor = conn.cursor()
+    def _get_insert_query(self, table, columns):
+        return f'''
+            INSERT INTO {table} ({', '.join(columns)})
+            VALUES ({', '.join('?' * len(columns))})
+        '''
 
-        df = pd.read_csv(file, skiprows=[1], delimiter=';', decimal=',')
+    def _import_file(self, file, table, file_columns, converters=None, constants=()):
+        '''
+        Stream the csv file into the table chunk by chunk - only one chunk is held in memory at a time.
+
+        Args:
+            file (str): Path of the csv file.
+            table (str): Destination table.
+            file_columns (list): Columns read from the file - named like the table columns.
+            converters (dict): Functions converting the values of the columns - see read_csv_chunks.
+            constants (tuple): (column, value) pairs of the table columns that are equal for all of the file rows.
+        '''
+        start_time = time.perf_counter()
 
-        df['rolling_element_type_id'] = rolling_element_type
+        columns = file_columns + [column for column, _ in constants]
+        constant_values = tuple(value for _, value in constants)
+        insert_query = self._get_insert_query(table, columns)
 
-        insert_query = '''
-            INSERT INTO RollingElements (d, rolling_element_type_id)
-            VALUES (?, ?)
-        '''
-        
-        for _, row in df.iterrows():
-            cursor.execute(insert_query, (row['d'], row['rolling_element_type_id']))
+        rows_number = 0
+        for rows, bytes_read, total_bytes in read_csv_chunks(file, file_columns, converters, self._chunk_size):
+            self._conn.executemany(insert_query, [row + constant_values for row in rows] if constant_values else rows)
+            rows_number += len(rows)
 
-        conn.commit()
-        conn.close()
+            if self._progress_callback:
+                self._progress_callback(file, rows_number, bytes_read, total_bytes)
 
-    def add_bearings(self, file, bearing_type, rolling_element_type, e=False):
-        conn = sqlite3.connect(self._database_abs_path)
-        cursor = conn.cursor()
+        self._import_report.append((table, rows_number, time.perf_counter() - start_time))
+
+    def add_materials(self, file):
+        self._import_file(file, 'Materials', list(MATERIALS_COLUMNS), get_converters(MATERIALS_COLUMNS))
+
+    def add_mounting_types(self):
+        mounting_types = [(name,) for name in MOUNTING_TYPES]
+
+        self._insert_rows('MountingTypes', ['name'], mounting_types)
+    
+    def add_rolling_element_types(self):
+        rolling_element_types = [(name,) for name in ROLLING_ELEMENT_TYPES]
+
+        self._insert_rows('RollingElementTypes', ['name'], rolling_element_types)
+
+    def add_bearing_types(self):
+        self._insert_rows('BearingTypes', ['name', 'rolling_element_type_id', 'mounting_type_id'], BEARING_TYPES)
 
-        df = pd.read_csv(file, skiprows=[1], delimiter=';', decimal=',')
+        self._conn.execute('''
+        INSERT INTO BearingTypesLookup (name, mounting_type, bearing_type_id, rolling_element_type_id)
+        SELECT BearingTypes.name, MountingTypes.name, BearingTypes.id, BearingTypes.rolling_element_type_id FROM BearingTypes
+        JOIN MountingTypes ON BearingTypes.mounting_type_id = MountingTypes.id
+        ''')
 
-        df['bearing_type_id'] = bearing_type
-        df['rolling_element_type_id'] = rolling_element_type
+    def add_rolling_elements(self, file, rolling_element_type):
+        self._import_file(file, 'RollingElements', list(ROLLING_ELEMENTS_COLUMNS), get_converters(ROLLING_ELEMENTS_COLUMNS),
+                          [('rolling_element_type_id', rolling_element_type)])
 
+    def add_bearings(self, file, bearing_type, rolling_element_type, e=False):
+        columns = list(BEARINGS_COLUMNS)
         if not e:
-            df['e'] = None
+            # Only the central bearings catalogues hold the eccentricity
+            columns.remove('e')
+
+        self._import_file(file, 'Bearings', columns, get_converters(BEARINGS_COLUMNS),
+                          [('bearing_type_id', bearing_type), ('rolling_element_type_id', rolling_element_type)])
+
+    def _remove_source_rows(self, table, args):
+        # Remove the rows imported from the csv file
+        if table == 'Materials':
+            self._conn.execute('DELETE FROM Materials')
+        elif table == 'RollingElements':
+            self._conn.execute('DELETE FROM RollingElements WHERE rolling_element_type_id = ?', (args[0],))
+        elif table == 'Bearings':
+            self._conn.execute('DELETE FROM Bearings WHERE bearing_type_id = ?', (args[0],))
+
+    def build(self, files=None):
+        '''
+        Import the catalogue csv files - only the new and changed ones if the database is updated
+        incrementally. Tables of the csv files that are gone get emptied.
 
-        insert_query = '''
-            INSERT INTO Bearings (designation, d_in, d_out, e, b, c, c_0, n_max, bearing_type_id, rolling_element_type_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        Args:
+            files (list): Paths of the csv files - all csv files of the data directory named by the convention by default.
+        '''
+        if files is None:
+            files = sorted(glob.glob(os.path.join(DATA_PATH, '*.csv')))
+
+        sources = {}
+        for file in files:
+            source = get_source(file)
+            if source is None:
+                sys.stderr.write(f"Warning: {os.path.basename(file)} does not match the catalogue files names - skipped.\n")
+            else:
+                sources[os.path.basename(file)] = (file, source, get_file_hash(file))
+
+        if self.is_rebuilt:
+            self.add_mounting_types()
+            self.add_bearing_types()
+            self.add_rolling_element_types()
+
+        imported_files = dict(self._conn.execute('SELECT file, hash FROM SourceFiles').fetchall())
+        for file_name in imported_files.keys() - sources.keys():
+            source = get_source(file_name)
+            if source is not None:
+                self._remove_source_rows(*source)
+            self._conn.execute('DELETE FROM SourceFiles WHERE file = ?', (file_name,))
+
+        changed_sources = [(file_name, *attributes) for file_name, attributes in sources.items() if imported_files.get(file_name) != attributes[2]]
+        for file_name, file, (table, args), file_hash in changed_sources:
+            if file_name in imported_files:
+                self._remove_source_rows(table, args)
+
+            if table == 'Materials':
+                self.add_materials(file)
+            elif table == 'RollingElements':
+                self.add_rolling_elements(file, *args)
+            elif table == 'Bearings':
+                self.add_bearings(file, *args)
+
+            self._conn.execute('INSERT OR REPLACE INTO SourceFiles (file, hash) VALUES (?, ?)', (file_name, file_hash))
+
+    def finish(self):
+        '''
+        Create the indexes, commit the database and close the connection.
+        '''
+        self._create_indexes()
+        self._conn.commit()
+        self._conn.close()
+
+        if self.is_rebuilt:
+            os.replace(self._build_database_path, self._database_abs_path)
+
+    def print_import_report(self):
+        '''
+        Print number of imported rows and import speed of every table.
         '''
-        
-        for _, row in df.iterrows():
-            cursor.execute(insert_query, (
-                row['designation'],
-                row['d_in'],
-                row['d_out'],
-                row['e'],
-                row['b'],
-                row['c'],
-                row['c_0'],
-                row['n_max'],
-                row['bearing_type_id'],
-                row['rolling_element_type_id']
-            ))
-
-        conn.commit()
-        conn.close()
-
-db_creator = DbCreator()
-
-db_creator.add_materials('data/wal_czynny-materialy.csv')
-db_creator.add_mounting_types()
-db_creator.add_bearing_types()
-db_creator.add_rolling_element_types()
-db_creator.add_rolling_elements('data/wal_czynny-elementy_toczne-kulki.csv', 1)
-db_creator.add_rolling_elements('data/wal_czynny-elementy_toczne-waleczki.csv', 2)
-db_creator.add_rolling_elements('data/wal_czynny-elementy_toczne-igielki.csv', 3)
-db_creator.add_bearings('data/wal_czynny-lozyska-podporowe-kulkowe.csv', 1, 1)
-db_creator.add_bearings('data/wal_czynny-lozyska-podporowe-walcowe.csv', 2, 2)
-db_creator.add_bearings('data/wal_czynny-lozyska-centralne-walcowe.csv', 3, 2, True)
-db_creator.add_bearings('data/wal_czynny-lozyska-centralne-igielkowe.csv', 4, 3, True)
\ No newline at end of file
+        total_rows = sum(rows for _, rows, _ in self._import_report)
+        total_time = sum(elapsed_time for _, _, elapsed_time in self._import_report)
+
+        for table, rows, elapsed_time in self._import_report + [('Total', total_rows, total_time)]:
+            rows_per_second = rows / elapsed_time if elapsed_time else 0
+            print(f'{table:<20} {rows:>8} rows {elapsed_time * 1000:>9.2f} ms {rows_per_second:>12.0f} rows/s')
+
+def print_progress(file, rows, bytes_read, total_bytes):
+    sys.stderr.write(f"\r{os.path.basename(file)}: {rows} rows ({bytes_read / total_bytes:.0%})")
+    if bytes_read == total_bytes:
+        sys.stderr.write('\n')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the components database from the catalogue csv files of the data directory.')
+    parser.add_argument('--incremental', action='store_true', help='import only the csv files changed since the last build')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='number of rows parsed and inserted at once')
+    parser.add_argument('--progress', action='store_true', help='report the import progress of every csv file')
+    parser.add_argument('--database', metavar='PATH', help='path of the built database - components.db of the data directory by default')
+    args = parser.parse_args()
+
+    db_creator = DbCreator(args.incremental, args.chunk_size, print_progress if args.progress else None, args.database)
+    db_creator.build()
+    db_creator.finish()
+    db_creator.print_import_report()
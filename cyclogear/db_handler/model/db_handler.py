@@ -1,55 +1,189 @@
-import sys
 import os
+import threading
+import pathlib
+from collections import OrderedDict
 
 import sqlite3
-import pandas as pd
 
 from config import DATA_PATH, DATA_DIR_NAME, dependencies_path
 
+import instrumentation
+
+from .bearings_ranking import BearingsRanking
+from .columns import BEARINGS_COLUMNS, BEARINGS_RANKING_COLUMNS, BEARING_TYPES_COLUMNS, ROLLING_ELEMENTS_COLUMNS, MATERIALS_COLUMNS, get_headers
+from .queries import SCHEMA_VERSION, SCHEMA_VERSION_QUERY, BEARINGS_QUERY, BEARING_TYPES_QUERY, ROLLING_ELEMENTS_QUERY, NEAREST_ROLLING_ELEMENTS_QUERY, MATERIALS_QUERY
+
+DATABASE_PATH = dependencies_path(f'{DATA_DIR_NAME}//components.db')
+
+class DatabaseError(Exception):
+    '''
+    Raised when the components database cannot be used.
+    '''
+
+def check_database(database_abs_path=DATABASE_PATH):
+    '''
+    Check that the components database exists and was built with the current schema - cheap enough
+    to be run at startup, so a broken install gets reported before any project data gets entered.
+
+    Args:
+        database_abs_path (str): Path of the database file.
+    Raises:
+        DatabaseError: If the database is missing or has to be rebuilt.
+    '''
+    # Check if destination folder where database file should be, exists
+    if not os.path.exists(DATA_PATH):
+        raise DatabaseError(f"Directory {DATA_PATH} does not exist.")
+    # Check if database file exists
+    if not os.path.exists(database_abs_path):
+        raise DatabaseError(f"Database file {database_abs_path} does not exist.")
+    # Check if the database was built with the current schema - the queries rely on its tables
+    try:
+        conn = sqlite3.connect(pathlib.Path(database_abs_path).resolve().as_uri() + '?mode=ro', uri=True)
+        try:
+            schema_version = conn.execute(SCHEMA_VERSION_QUERY).fetchone()[0]
+        finally:
+            conn.close()
+    except (sqlite3.Error, TypeError):
+        schema_version = None
+    if schema_version != SCHEMA_VERSION:
+        raise DatabaseError(f"Database file {database_abs_path} was built by an older version of the app - rebuild it with db_creator.py.")
+
 class DbHandler:
-    def __init__(self) -> None:
-        self._database_abs_path = dependencies_path(f'{DATA_DIR_NAME}//components.db')
+    def __init__(self, cache_size=64) -> None:
+        self._database_abs_path = DATABASE_PATH
+
+        # Results of the queries - the catalogue does not change at runtime, so every
+        # query gets run once until the database gets modified
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self._database_version = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Connections are kept open for the handler lifetime - one per thread, as sqlite3
+        # connections must not be shared between threads
+        self._connections = threading.local()
 
         self._check_if_database_exists()
+
+        # Bearings catalogues loaded for ranking
+        self._bearings_rankings = {}
     
     def _check_if_database_exists(self):
-         # Check if destination folder where database file should be, exists
-        if not os.path.exists(DATA_PATH):
-            sys.stderr.write(f"Error: Directory {DATA_PATH} does not exist.\n")
-            sys.exit(1)
-        # Check if database file exists
-        if not os.path.exists(self._database_abs_path):
-            sys.stderr.write(f"Error: Database file {self._database_abs_path} does not exist.\n")
-            sys.exit(1)
+        # The handler gets created on the first use of the database - raise instead of exiting,
+        # so the failure does not end the session
+        check_database(self._database_abs_path)
         # Check the connection with the database
         try:
-            conn = sqlite3.connect(self._database_abs_path)
-            conn.close()
+            self._get_connection()
         except sqlite3.Error as e:
-            sys.stderr.write(f"Connection failed with error: {e}")
-    
-    def fetch_bearings(self, support_type, bearing_type, min_d_in=None, min_C=None):
-        conn = sqlite3.connect(self._database_abs_path)
+            raise DatabaseError(f"Connection failed with error: {e}")
+
+    def _get_connection(self):
+        conn = getattr(self._connections, 'conn', None)
+        if conn is None:
+            # The database is static at runtime - open it read-only and keep the compiled statements cached
+            uri = pathlib.Path(self._database_abs_path).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, cached_statements=128)
+            conn.execute('PRAGMA query_only = ON')
+            conn.execute('PRAGMA mmap_size = 67108864')
+            self._connections.conn = conn
+        return conn
 
-        query = '''
-        SELECT designation, d_in, d_out, {} b, c, c_0, n_max FROM Bearings
-        JOIN BearingTypes ON Bearings.bearing_type_id = BearingTypes.id
-        JOIN MountingTypes ON BearingTypes.mounting_type_id = MountingTypes.id
-        WHERE BearingTypes.name = ? AND MountingTypes.name = ?
+    def _get_database_version(self):
+        # The file gets replaced when the database is rebuilt, data_version changes when
+        # another connection modifies it
+        database_stat = os.stat(self._database_abs_path)
+        data_version = self._get_connection().execute('PRAGMA data_version').fetchone()[0]
+        return database_stat.st_mtime_ns, database_stat.st_ino, data_version
+
+    def _validate_cache(self):
+        database_version = self._get_database_version()
+        if database_version != self._database_version:
+            if self._database_version is not None and database_version[:2] != self._database_version[:2]:
+                # Reopen the connection to the new database file
+                self.close()
+                database_version = self._get_database_version()
+            self._cache.clear()
+            self._bearings_rankings = {}
+            self._database_version = database_version
+
+    def _fetch(self, query, params=()):
         '''
+        Get the query results from the cache or run the query.
 
-        # Modify the query and headers depending on the support type
-        if support_type == 'centralne':
-            additional_column = 'e,'
-            headers = ['kod', 'D<sub>w</sub>', 'D<sub>z</sub>', 'E', 'B', 'C', 'C<sub>0</sub>', 'n<sub>max</sub>']
-            units = ['-', 'mm', 'mm', 'mm', 'mm', 'MPa', 'MPa', 'obr/min']
-        else:
-            additional_column = ''
-            headers = ['kod', 'D<sub>w</sub>', 'D<sub>z</sub>', 'B', 'C', 'C<sub>0</sub>', 'n<sub>max</sub>']
-            units = ['-', 'mm', 'mm', 'mm', 'MPa', 'MPa', 'obr/min']
+        Args:
+            query (str): SQL query.
+            params (tuple): Query parameters.
+        Returns:
+            (tuple): list of the columns names and list of the rows.
+        '''
+        key = (query, tuple(params))
+        with self._cache_lock:
+            self._validate_cache()
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                instrumentation.count('db.cache_hits')
+                keys, rows = self._cache[key]
+            else:
+                self.cache_misses += 1
+                instrumentation.count('db.cache_misses')
+                keys, rows = self._execute(query, params)
+                self._cache[key] = (keys, rows)
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        # Return copies, so the cached results stay intact
+        return list(keys), [list(row) for row in rows]
+
+    def _execute(self, query, params=()):
+        '''
+        Run the query.
+
+        Args:
+            query (str): SQL query.
+            params (tuple): Query parameters.
+        Returns:
+            (tuple): list of the columns names and list of the rows.
+        '''
+        with instrumentation.timer('db.execute'):
+            cursor = self._get_connection().execute(query, params)
+            keys = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        return keys, rows
 
-        # Format the query with the additional column if needed
-        query = query.format(additional_column)
+    def get_cache_info(self):
+        '''
+        Get the queries cache statistics.
+
+        Returns:
+            (dict): numbers of cache hits, misses, cached queries and the cache size limit.
+        '''
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._cache), 'max_size': self._cache_size}
+
+    def clear_cache(self):
+        '''
+        Clear the queries cache.
+        '''
+        with self._cache_lock:
+            self._cache.clear()
+            self._bearings_rankings = {}
+
+    def close(self):
+        '''
+        Close the connection of the current thread.
+        '''
+        conn = getattr(self._connections, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._connections.conn = None
+    
+    @instrumentation.timed('db.fetch_bearings')
+    def fetch_bearings(self, support_type, bearing_type, min_d_in=None, min_C=None):
+        # Only the central bearings have the eccentricity column
+        query = BEARINGS_QUERY.format('e,' if support_type == 'centralne' else '')
 
         # Add constraints for min_d_in and min_C if provided
         constraints = []
@@ -68,107 +202,66 @@ class DbHandler:
 
             # Add limit to ensure only 5 results are returned
             query += ' ORDER BY d_in, c_0 LIMIT 5'
+        else:
+            # Keep the catalogue order
+            query += ' ORDER BY Bearings.id'
 
-        df = pd.read_sql_query(query, conn, params=params)
-        
-        conn.close()
-
-        # Combine headers with units for display
-        headers = [header + f'<br><small>[{unit}]</small>' for header, unit in zip(headers, units)]
-        keys = df.columns.tolist()
-        data = df.values.tolist()
+        keys, data = self._fetch(query, params)
 
-        return headers, keys, data
+        return get_headers(BEARINGS_COLUMNS, keys), keys, data
 
-    def fetch_bearing_types(self, mount_type):
-        conn = sqlite3.connect(self._database_abs_path)
+    @instrumentation.timed('db.fetch_bearings_ranking')
+    def fetch_bearings_ranking(self, support_type, bearing_type, conditions, min_d_in=None, sort_by='P', page=0, page_size=20):
+        '''
+        Rank the whole catalogue of bearings of given type.
 
-        query = '''
-        SELECT BearingTypes.name FROM BearingTypes 
-        JOIN RollingElementTypes ON BearingTypes.rolling_element_type_id = RollingElementTypes.id
-        JOIN MountingTypes ON BearingTypes.mounting_type_id = MountingTypes.id
-        WHERE MountingTypes.name = ?
+        Args:
+            support_type (str): Mounting type of the bearings.
+            bearing_type (str): Type of the bearings.
+            conditions (dict): Bearing working conditions - see BearingsRanking.rank.
+            min_d_in (float): Minimal inner diameter of the bearing [mm].
+            sort_by (str): Attribute to sort the ranking by.
+            page (int): Number of the page of the ranking.
+            page_size (int): Number of bearings on a page.
+        Returns:
+            (tuple): headers, keys and rows of the ranking page and the total number of ranked bearings.
         '''
+        with self._cache_lock:
+            self._validate_cache()
+            ranking = self._bearings_rankings.get((support_type, bearing_type))
 
-        df = pd.read_sql_query(query, conn, params=(mount_type,))
-        
-        conn.close()
+        if ranking is None:
+            # Load the catalogue once - the ranking gets recalculated for the changed conditions only
+            query = BEARINGS_QUERY.format('e,' if support_type == 'centralne' else '')
 
-        headers = ['Rodzaj łożyska']
-        keys = df.columns.tolist() 
-        data = df.values.tolist()
+            keys, rows = self._fetch(query, (bearing_type, support_type))
 
-        return headers, keys, data
+            with self._cache_lock:
+                ranking = self._bearings_rankings.setdefault((support_type, bearing_type), BearingsRanking(keys, rows, bearing_type, support_type))
 
-    def fetch_rolling_elements(self, bearing_type, d_min=None):
-        conn = sqlite3.connect(self._database_abs_path)
+        keys, data, total = ranking.rank(conditions, min_d_in, sort_by, page, page_size)
+
+        return get_headers(BEARINGS_RANKING_COLUMNS, keys), keys, data, total
+
+    @instrumentation.timed('db.fetch_bearing_types')
+    def fetch_bearing_types(self, mount_type):
+        keys, data = self._fetch(BEARING_TYPES_QUERY, (mount_type,))
 
+        return get_headers(BEARING_TYPES_COLUMNS, keys), keys, data
+
+    @instrumentation.timed('db.fetch_rolling_elements')
+    def fetch_rolling_elements(self, bearing_type, d_min=None):
         if d_min is None:
             # If d is None, list all results
-            query = '''
-                SELECT RollingElements.d FROM BearingTypes
-                JOIN RollingElements ON BearingTypes.rolling_element_type_id = RollingElements.rolling_element_type_id
-                WHERE BearingTypes.name = ?
-                ORDER BY d
-            '''
-            df = pd.read_sql_query(query, conn, params=(bearing_type,))
+            keys, data = self._fetch(ROLLING_ELEMENTS_QUERY, (bearing_type,))
         else:
-            # Query to check if an exact match exists
-            query_exact = '''
-                SELECT RollingElements.d FROM BearingTypes
-                JOIN RollingElements ON BearingTypes.rolling_element_type_id = RollingElements.rolling_element_type_id
-                WHERE BearingTypes.name = ? AND RollingElements.d = ?
-            '''
-            df_exact = pd.read_sql_query(query_exact, conn, params=(bearing_type, d_min))
-            
-            if not df_exact.empty:
-                # Exact match found, return it
-                df = df_exact
-            else:
-                # Exact match not found, find closest lower and greater values
-                query_smaller = '''
-                    SELECT RollingElements.d FROM BearingTypes
-                    JOIN RollingElements ON BearingTypes.rolling_element_type_id = RollingElements.rolling_element_type_id
-                    WHERE BearingTypes.name = ? AND RollingElements.d < ?
-                    ORDER BY RollingElements.d DESC
-                    LIMIT 1
-                '''
-                query_greater = '''
-                    SELECT RollingElements.d FROM BearingTypes
-                    JOIN RollingElements ON BearingTypes.rolling_element_type_id = RollingElements.rolling_element_type_id
-                    WHERE BearingTypes.name = ? AND RollingElements.d > ?
-                    ORDER BY RollingElements.d ASC
-                    LIMIT 1
-                '''
-                df_smaller = pd.read_sql_query(query_smaller, conn, params=(bearing_type, d_min))
-                df_greater = pd.read_sql_query(query_greater, conn, params=(bearing_type, d_min))
-                df = pd.concat([df_smaller, df_greater]).sort_values(by='d').reset_index(drop=True)
-
-        headers = ['D']
-        units = ['mm']
-
-        headers = [header + f'<br><small>[{unit}]</small>' for header, unit in zip(headers, units)]
-        keys = df.columns.tolist()
-        data = df.values.tolist()
-
-        return headers, keys, data
-        
-    def fetch_materials(self):
-        conn = sqlite3.connect(self._database_abs_path)
-
-        query = '''
-        SELECT  name, r_m, r_e, z_gj, z_go, z_sj, z_so, e, g, ro FROM Materials
-        '''
+            # Exact match if it exists, otherwise the closest lower and greater values
+            keys, data = self._fetch(NEAREST_ROLLING_ELEMENTS_QUERY, (bearing_type, d_min))
 
-        df = pd.read_sql_query(query, conn)
+        return get_headers(ROLLING_ELEMENTS_COLUMNS, keys), keys, data
         
-        conn.close()
-
-        headers = ['kod', 'R<sub>m</sub>', 'R<sub>e</sub>', 'Z<sub>gj</sub>', 'Z<sub>go</sub>', 'Z<sub>sj</sub>', 'Z<sub>so</sub>', 'E', 'G', 'ρ']
-        units = ['-', 'MPa', 'MPa', 'MPa', 'MPa', 'MPa', 'MPa', 'MPa', 'MPa', 'kg/m<sup>3</sup>']
-        
-        headers = [ header + f'<br><small>[{unit}]</small>' for header, unit in zip(headers, units)]
-        keys = df.columns.tolist()
-        data = df.values.tolist()
+    @instrumentation.timed('db.fetch_materials')
+    def fetch_materials(self):
+        keys, data = self._fetch(MATERIALS_QUERY)
 
-        return headers, keys, data
+        return get_headers(MATERIALS_COLUMNS, keys), keys, data
@@ -0,0 +1,52 @@
+'''
+SQL queries and schema version of the components database - shared by DbHandler and DbCreator.
+'''
+# Version of the database schema - databases of other versions get rebuilt from scratch by DbCreator
+# and refused by DbHandler, as the queries rely on the tables of the current schema
+SCHEMA_VERSION = 2
+
+SCHEMA_VERSION_QUERY = '''
+SELECT version FROM SchemaVersion
+'''
+
+# Bearings of given type and mounting - the {} placeholder takes the additional columns
+BEARINGS_QUERY = '''
+SELECT designation, d_in, d_out, {} b, c, c_0, n_max FROM BearingTypesLookup
+JOIN Bearings ON Bearings.bearing_type_id = BearingTypesLookup.bearing_type_id
+WHERE BearingTypesLookup.name = ? AND BearingTypesLookup.mounting_type = ?
+'''
+
+BEARING_TYPES_QUERY = '''
+SELECT name FROM BearingTypesLookup
+WHERE mounting_type = ?
+ORDER BY bearing_type_id
+'''
+
+ROLLING_ELEMENTS_QUERY = '''
+SELECT d FROM RollingElements
+WHERE rolling_element_type_id IN (SELECT rolling_element_type_id FROM BearingTypesLookup WHERE name = ?)
+ORDER BY d
+'''
+
+# Rolling elements of exactly given diameter or, if there are none, the nearest smaller and greater ones
+NEAREST_ROLLING_ELEMENTS_QUERY = '''
+SELECT d FROM RollingElements
+WHERE rolling_element_type_id IN (SELECT rolling_element_type_id FROM BearingTypesLookup WHERE name = ?1) AND d = ?2
+UNION ALL
+SELECT d FROM (
+    SELECT MAX(d) AS d FROM RollingElements
+    WHERE rolling_element_type_id IN (SELECT rolling_element_type_id FROM BearingTypesLookup WHERE name = ?1) AND d < ?2
+    UNION ALL
+    SELECT MIN(d) AS d FROM RollingElements
+    WHERE rolling_element_type_id IN (SELECT rolling_element_type_id FROM BearingTypesLookup WHERE name = ?1) AND d > ?2
+)
+WHERE d IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM RollingElements
+    WHERE rolling_element_type_id IN (SELECT rolling_element_type_id FROM BearingTypesLookup WHERE name = ?1) AND d = ?2
+)
+ORDER BY d
+'''
+
+MATERIALS_QUERY = '''
+SELECT  name, r_m, r_e, z_gj, z_go, z_sj, z_so, e, g, ro FROM Materials
+'''
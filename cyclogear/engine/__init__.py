@@ -0,0 +1,14 @@
+"""
+Headless calculation engine - runs the input mechanism calculations on a saved project
+without starting the GUI (no PyQt6 or matplotlib imports).
+"""
+import sys, os
+
+# The application modules are imported relative to the cyclogear directory - add it
+# to sys.path if the engine is imported from outside (e.g. as cyclogear.engine)
+cyclogear_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if cyclogear_dir not in sys.path:
+    sys.path.append(cyclogear_dir)
+
+from .design_engine import DesignEngine, load_project, evaluate_project
@@ -0,0 +1,176 @@
+import copy
+import json
+
+from input_mechanism.model.input_mechanism_calculator import InputMechanismCalculator
+from input_mechanism.tabs.bearings_tab.model.bearings_tab_calculator import BearingsTabCalculator
+from input_mechanism.tabs.power_loss_tab.model.power_loss_calculator import PowerLossTabCalculator
+
+from shaft_designer.model.functions_calculator import FunctionsCalculator
+from shaft_designer.model.shaft_calculator import ShaftCalculator
+from shaft_designer.model.shaft_optimizer import ShaftOptimizer
+
+def load_project(file_path):
+    """
+    Load project saved by the application.
+
+    Args:
+        file_path (str): Path to the project .json file.
+    Returns:
+        (list): Project data - [component data, shaft sections, tabs data..., isShaftDesigned flag].
+    """
+    with open(file_path, 'r') as read_file:
+        return json.load(read_file)
+
+class DesignEngine:
+    """
+    Run the whole input mechanism calculation pipeline on the project data - the same calculations
+    the controllers run on the data entered in the GUI.
+    """
+    def __init__(self, sampling='uniform'):
+        """
+        Args:
+            sampling (str): Sampling mode of the shaft functions - see FunctionsCalculator.
+        """
+        self._sampling = sampling
+
+    def _calculate_mechanism_data(self, project):
+        self._calculator = InputMechanismCalculator()
+        self._calculator.set_data(copy.deepcopy(project[0]))
+        self._calculator.set_initial_data()
+        self._data = self._calculator.get_data()
+
+    def _calculate_shaft(self, project):
+        self._functions_calculator = FunctionsCalculator(sampling=self._sampling)
+        self._functions_calculator.calculate_initial_functions_and_attributes(self._data)
+
+        self._shaft_calculator = ShaftCalculator()
+        self._shaft_calculator.set_data(self._functions_calculator.get_shaft_initial_attributes())
+        self._shaft_steps = []
+        self._is_whole_shaft_designed = False
+
+        if project[1]:
+            # Subsections numbers become strings in the saved .json file
+            for section_name, section in project[1].items():
+                for subsection_number, subsection in section.items():
+                    self._shaft_calculator.calculate_shaft_sections((section_name, int(subsection_number), copy.deepcopy(subsection), None))
+
+            self._shaft_steps = self._shaft_calculator.get_shaft_attributes()
+            self._is_whole_shaft_designed = self._shaft_calculator.is_whole_shaft_designed()
+            if self._is_whole_shaft_designed:
+                self._functions_calculator.calculate_remaining_functions(copy.deepcopy(self._shaft_steps))
+                self._shaft_calculator.save_data(self._data)
+
+    def _calculate_bearings(self):
+        bearings_calculator = BearingsTabCalculator()
+        bearings_calculator.init_data(self._data, None, None)
+        power_loss_calculator = PowerLossTabCalculator()
+        power_loss_calculator.init_data(self._data, None, None)
+
+        self._bearings = {}
+        for bearing_section_id, attributes in self._data['Bearings'].items():
+            results = {'C': None, 'P': None}
+
+            if attributes['bearing_type'] and all(attributes[key][0] is not None for key in ['Lh', 'fd', 'ft']):
+                results['C'] = float(bearings_calculator.calculate_bearing_load_capacity(bearing_section_id, self._data))
+
+            if attributes['data'] and attributes['rolling_elements'] and attributes['f'][0] is not None:
+                results['P'] = float(power_loss_calculator.calculate_bearing_power_loss(bearing_section_id, self._data))
+
+            self._bearings[bearing_section_id] = results
+
+        power_losses = [results['P'] for results in self._bearings.values()]
+        self._power_loss = sum(power_losses) if None not in power_losses else None
+
+    def _check_design(self):
+        # The shaft steps must not be thinner than the minimal diameter anywhere along them
+        shaft_passed = self._is_whole_shaft_designed
+        if shaft_passed:
+            functions = self._functions_calculator.get_shaft_functions()
+            z = functions['z']
+            d_min = functions['dmin(z)']['dmin']['function']
+            for step in self._shaft_steps:
+                is_within_step = (step['z'] <= z) & (z <= step['z'] + step['l'])
+                if d_min[is_within_step].max(initial=0) > step['d']:
+                    shaft_passed = False
+                    break
+
+        # The selected bearings must carry the required load capacity
+        bearings_passed = {}
+        for bearing_section_id, results in self._bearings.items():
+            bearing_data = self._data['Bearings'][bearing_section_id]['data']
+            if results['C'] is None or not bearing_data:
+                bearings_passed[bearing_section_id] = None
+            else:
+                bearings_passed[bearing_section_id] = bool(bearing_data['c'][0] >= results['C'])
+
+        passed = shaft_passed and all(bearings_passed.values())
+        return {'shaft': shaft_passed, 'Bearings': bearings_passed, 'passed': passed}
+
+    def evaluate(self, project, include_functions=False):
+        """
+        Evaluate the project.
+
+        Args:
+            project (list): Project data in the format written by InputMechanismController.save_data.
+            include_functions (bool): Specifies whether to include the shaft functions in the results.
+        Returns:
+            (dict): Calculation results.
+        """
+        self._calculate_mechanism_data(project)
+        self._calculate_shaft(project)
+        self._calculate_bearings()
+
+        # Cast the calculated values to built-in floats so the results can be serialized
+        results = {key: float(self._data[key][0]) for key in ['dsc', 'dec', 'Ra', 'Rb', 'F']}
+        results.update({
+            'is_whole_shaft_designed': self._is_whole_shaft_designed,
+            'shaft_steps': self._shaft_steps,
+            'Bearings': self._bearings,
+            'P': self._power_loss,
+            'checks': self._check_design(),
+        })
+
+        if include_functions:
+            results['functions'] = self._functions_calculator.get_shaft_functions()
+
+        return results
+
+    def optimize_shaft(self, project, **options):
+        """
+        Propose the shaft of minimal mass for the project - the saved shaft sections are ignored.
+
+        Args:
+            project (list): Project data in the format written by InputMechanismController.save_data.
+            options: ShaftOptimizer options.
+        Returns:
+            (dict): Optimization results - see ShaftOptimizer.optimize.
+        """
+        self._calculate_mechanism_data(project)
+
+        # Designs get evaluated one after another - recalculate only what changed between them
+        functions_calculator = FunctionsCalculator(sampling=self._sampling, incremental=True)
+        functions_calculator.calculate_initial_functions_and_attributes(self._data)
+        shaft_attributes = functions_calculator.get_shaft_initial_attributes()
+
+        optimizer = ShaftOptimizer(functions_calculator, **options)
+        return optimizer.optimize(shaft_attributes, self._data['Materiał']['ro'][0])
+
+    def get_data(self):
+        """
+        Get component data calculated with the last evaluation.
+        """
+        return self._data
+
+def evaluate_project(project, include_functions=False):
+    """
+    Evaluate the project with a new engine instance.
+
+    Args:
+        project (list | str): Project data or path to the project .json file.
+        include_functions (bool): Specifies whether to include the shaft functions in the results.
+    Returns:
+        (dict): Calculation results.
+    """
+    if isinstance(project, str):
+        project = load_project(project)
+    return DesignEngine().evaluate(project, include_functions)
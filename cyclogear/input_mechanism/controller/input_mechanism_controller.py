@@ -1,3 +1,5 @@
+import sys
+
 from ..mediator import Mediator
 
 from ..model.input_mechanism_calculator import InputMechanismCalculator
@@ -17,12 +19,9 @@ from ..tabs.power_loss_tab.controller.power_loss_controller import PowerLossTabC
 from ..tabs.results_tab.view.ResultsTab import ResultsTab
 from ..tabs.results_tab.controller.results_tab_controller import ResultsTabController
 
-from shaft_designer.view.ShaftDesigner import ShaftDesigner
-from shaft_designer.controller.shaft_designer_controller import ShaftDesignerController
+from db_handler.model.db_handler import DatabaseError, check_database
 
-from db_handler.controller.db_controller import DbController
-from db_handler.model.db_handler import DbHandler
-from db_handler.view.DbItemsWindow import DbItemsWindow
+from utils.message_handler import MessageHandler
 
 class InputMechanismController:
     """
@@ -46,13 +45,20 @@ class InputMechanismController:
         self._connect_signals_and_slots()
 
     def _startup(self):
-        """Initialize the input shaft widget with necessary data, set up tabs and initialize the shaft designer"""
-        self.db_window = DbItemsWindow(self._input_mechanism)
-        self.db_controller = DbController(self.db_window)
+        """Initialize the input shaft widget with necessary data and set up tabs"""
+        # The database window and the shaft designer get initialized on their first use - check
+        # the database at once anyway, so a broken install stops the app before any data gets entered
+        try:
+            check_database()
+        except DatabaseError as e:
+            sys.stderr.write(f"Error: {e}\n")
+            sys.exit(1)
+        self._db_controller = None
+        self._shaft_designer_controller = None
+
         self._mediator = Mediator()
         self._calculator.set_initial_data()
         self._initTabs()
-        self._init_shaft_designer()
 
     def _initTabs(self):
         tab_id = 1
@@ -85,7 +91,19 @@ class InputMechanismController:
 
         self._input_mechanism.initTabs(self.tabs, tab_titles)
 
+    def _init_db_window(self):
+        # Import the database modules only when needed - they are not used until an item gets selected
+        from db_handler.controller.db_controller import DbController
+        from db_handler.view.DbItemsWindow import DbItemsWindow
+
+        self.db_window = DbItemsWindow(self._input_mechanism)
+        self._db_controller = DbController(self.db_window)
+
     def _init_shaft_designer(self):
+        # Import the shaft designer modules only when needed - they load the whole matplotlib stack
+        from shaft_designer.view.ShaftDesigner import ShaftDesigner
+        from shaft_designer.controller.shaft_designer_controller import ShaftDesignerController
+
         # Set an instance of shaft designer
         window_title = 'Wał Czynny'
         self._shaft_designer = ShaftDesigner(window_title)
@@ -93,6 +111,24 @@ class InputMechanismController:
         # Set an instance of shaft designer controller
         self._shaft_designer_controller = ShaftDesignerController(self._shaft_designer, self._mediator)
 
+    @property
+    def db_controller(self):
+        """
+        Database controller - None if the database cannot be used anymore, which gets reported to the user.
+        """
+        if self._db_controller is None:
+            try:
+                self._init_db_window()
+            except DatabaseError as e:
+                MessageHandler.critical(self._input_mechanism, 'Błąd bazy danych', f'Nie można użyć bazy danych: {e}')
+        return self._db_controller
+
+    @property
+    def shaft_designer_controller(self):
+        if self._shaft_designer_controller is None:
+            self._init_shaft_designer()
+        return self._shaft_designer_controller
+
     def _connect_signals_and_slots(self):
         """
         Connect signals and slots for interactivity in the application.
@@ -123,14 +159,17 @@ class InputMechanismController:
             self._on_update_power_loss_data()
 
     def _open_shaft_designer_window(self):
+        if self._shaft_designer_controller is None:
+            self._init_shaft_designer()
         self._shaft_designer.show()
 
     def _on_select_materials(self):
         """
         Open selection of shaft material from database
         """
-        if self.db_controller.show_materials():
-            self.tab_controllers[0].on_materials_selected(self.db_controller.data)
+        db_controller = self.db_controller
+        if db_controller and db_controller.show_materials():
+            self.tab_controllers[0].on_materials_selected(db_controller.data)
     
     def _on_select_bearing_type(self, bearing_section_id):
         """
@@ -140,8 +179,9 @@ class InputMechanismController:
             bearing_section_id (str): Id of section that specifies the bearing location.
         """
         support_type = 'centralne' if bearing_section_id == 'eccentrics' else 'podporowe'
-        if self.db_controller.show_bearing_types(support_type):
-            self.tab_controllers[1].on_bearing_type_selected(bearing_section_id, self.db_controller.data)
+        db_controller = self.db_controller
+        if db_controller and db_controller.show_bearing_types(support_type):
+            self.tab_controllers[1].on_bearing_type_selected(bearing_section_id, db_controller.data)
 
     def _on_select_bearing(self, bearing_section_id, data):
         """
@@ -154,8 +194,9 @@ class InputMechanismController:
         support_type = 'centralne' if bearing_section_id == 'eccentrics' else 'podporowe'
         bearing_type = self._calculator.get_bearing_type(bearing_section_id)
         limits = self._calculator.get_bearings_attributes_limits(bearing_section_id)
-        if self.db_controller.show_bearings(support_type, bearing_type, *limits):
-            self.tab_controllers[1].on_bearing_selected(bearing_section_id, self.db_controller.data)
+        db_controller = self.db_controller
+        if db_controller and db_controller.show_bearings(support_type, bearing_type, *limits):
+            self.tab_controllers[1].on_bearing_selected(bearing_section_id, db_controller.data)
 
     def _on_select_rolling_element(self, bearing_section_id, data):
         """
@@ -167,8 +208,9 @@ class InputMechanismController:
         self._calculator.update_data(data)
         bearing_type = self._calculator.get_bearing_type(bearing_section_id)
         limits = self._calculator.get_rollings_element_limits(bearing_section_id)
-        if self.db_controller.show_rolling_elements(bearing_type, limits):
-            self.tab_controllers[2].on_rolling_element_selected(bearing_section_id, self.db_controller.data)
+        db_controller = self.db_controller
+        if db_controller and db_controller.show_rolling_elements(bearing_type, limits):
+            self.tab_controllers[2].on_rolling_element_selected(bearing_section_id, db_controller.data)
 
     def _on_update_preliminary_data(self):
         """
@@ -176,7 +218,7 @@ class InputMechanismController:
 
         :param data: Data used for calculating input shaft attributes.
         """
-        self._shaft_designer_controller.update_shaft_data(self._calculator.get_data())
+        self.shaft_designer_controller.update_shaft_data(self._calculator.get_data())
 
     def _on_update_bearings_data(self):
         self._calculator.calculate_bearings_attributes()
@@ -186,7 +228,7 @@ class InputMechanismController:
 
     def _on_bearing_changed(self, bearing_section_id, bearing_data):
         bearing_data = self._calculator.get_bearing_attributes(bearing_section_id, bearing_data)
-        self._shaft_designer_controller.update_bearing_data(bearing_data)
+        self.shaft_designer_controller.update_bearing_data(bearing_data)
 
     def _on_shaft_designing_finished(self):
         self._input_mechanism.handleShaftDesigningFinished()
@@ -199,8 +241,8 @@ class InputMechanismController:
         # Get calculator data
         data.append(self._calculator.get_data())
 
-        # Get shaft designer data
-        data.append(self._shaft_designer_controller.get_shaft_data())
+        # Get shaft designer data - there is none if the shaft designer was not used
+        data.append(self._shaft_designer_controller.get_shaft_data() if self._shaft_designer_controller else {})
 
         # Get every tab data
         for tab_controller in self.tab_controllers[:-1]:
@@ -220,8 +262,8 @@ class InputMechanismController:
 
         # Set the shaft designer data
         if data[1]:
-            self._shaft_designer_controller.update_shaft_data(self._calculator.get_data())
-            self._shaft_designer_controller.set_shaft_data(data[1])
+            self.shaft_designer_controller.update_shaft_data(self._calculator.get_data())
+            self.shaft_designer_controller.set_shaft_data(data[1])
 
         # Set every tab data
         for idx, tab_controller in enumerate(self.tab_controllers[:-1]):
@@ -0,0 +1,174 @@
+"""
+Opt-in timers and counters of the application hot paths.
+
+The instrumentation is disabled by default - the timers and counters then cost a single flag check.
+Set the CYCLOGEAR_INSTRUMENTATION environment variable to a JSON file path to enable it and dump
+the collected data to the file when the application exits, or enable it with enable().
+
+Usage:
+    import instrumentation
+
+    @instrumentation.timed('functions.support_reactions')
+    def calculate():
+        ...
+
+    with instrumentation.timer('db.query'):
+        ...
+
+    instrumentation.count('db.cache_hits')
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+INSTRUMENTATION_VARIABLE = 'CYCLOGEAR_INSTRUMENTATION'
+
+_enabled = False
+_dump_path = None
+_lock = threading.Lock()
+_timers = {}    # name: [count, total, min, max] [s]
+_counters = {}  # name: count
+
+def is_enabled():
+    return _enabled
+
+def enable(dump_path=None):
+    """
+    Enable the instrumentation.
+
+    Args:
+        dump_path (str): Path of the JSON file the snapshot gets dumped to at exit - no dump by default.
+    """
+    global _enabled, _dump_path
+    _enabled = True
+    if dump_path and _dump_path is None:
+        atexit.register(_dump_at_exit)
+    _dump_path = dump_path or _dump_path
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def reset():
+    """
+    Forget all the collected timings and counts.
+    """
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+def add_timing(name, duration):
+    """
+    Record a duration of the timed code.
+
+    Args:
+        name (str): Name of the timer.
+        duration (float): Duration [s].
+    """
+    with _lock:
+        timing = _timers.get(name)
+        if timing is None:
+            _timers[name] = [1, duration, duration, duration]
+        else:
+            timing[0] += 1
+            timing[1] += duration
+            timing[2] = min(timing[2], duration)
+            timing[3] = max(timing[3], duration)
+
+@contextmanager
+def timer(name):
+    """
+    Time the code in the context.
+
+    Args:
+        name (str): Name of the timer - durations of timers of the same name get aggregated.
+    """
+    if not _enabled:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - start_time)
+
+def timed(name):
+    """
+    Decorator timing every call of the function.
+
+    Args:
+        name (str): Name of the timer.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+
+            start_time = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add_timing(name, time.perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+def count(name, value=1):
+    """
+    Increase the counter.
+
+    Args:
+        name (str): Name of the counter.
+        value (int): Value to add.
+    """
+    if not _enabled:
+        return
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def snapshot():
+    """
+    Get the collected data.
+
+    Returns:
+        (dict): 'timers' - name: number of calls 'count' and 'total', 'mean', 'min', 'max' durations [ms],
+                'counters' - name: count.
+    """
+    with _lock:
+        timers = {name: {'count': count,
+                         'total': round(total * 1000, 4),
+                         'mean': round(total / count * 1000, 4),
+                         'min': round(min_duration * 1000, 4),
+                         'max': round(max_duration * 1000, 4)} for name, (count, total, min_duration, max_duration) in sorted(_timers.items())}
+        counters = dict(sorted(_counters.items()))
+
+    return {'timers': timers, 'counters': counters}
+
+def dump(path):
+    """
+    Write the snapshot to the JSON file.
+
+    Args:
+        path (str): Path of the file.
+    """
+    with open(path, 'w') as file:
+        json.dump(snapshot(), file, indent=2)
+        file.write('\n')
+
+def _dump_at_exit():
+    if _dump_path is None:
+        return
+    try:
+        dump(_dump_path)
+    except OSError as e:
+        sys.stderr.write(f"Error: instrumentation data could not be written to {_dump_path}: {e}\n")
+
+if os.environ.get(INSTRUMENTATION_VARIABLE):
+    enable(os.environ[INSTRUMENTATION_VARIABLE])
@@ -1,24 +1,35 @@
+import time
+
+startup_start_time = time.perf_counter()
+
 import path_config
 
 import sys
 
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QCoreApplication
+from main_interface.model.startup_timer import StartupTimer
+
+startup_timer = StartupTimer(startup_start_time)
+
+with startup_timer.phase('imports'):
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QCoreApplication
 
-from main_interface.view.MainWindow import MainWindow
-from main_interface.controller.main_controller import MainController
+    from main_interface.view.MainWindow import MainWindow
+    from main_interface.controller.main_controller import MainController
 
 def on_about_to_quit():
     # Perform necessary checks or operations
     QCoreApplication.processEvents()
 
 def main():
-    cyclo_app = QApplication([])
-    cyclo_app.aboutToQuit.connect(on_about_to_quit)
+    with startup_timer.phase('application'):
+        cyclo_app = QApplication([])
+        cyclo_app.aboutToQuit.connect(on_about_to_quit)
 
-    main_window = MainWindow()
+    with startup_timer.phase('main_window'):
+        main_window = MainWindow()
 
-    main_controller = MainController(main_window)
+    main_controller = MainController(main_window, startup_timer)
 
     sys.exit(cyclo_app.exec())
 
@@ -5,6 +5,7 @@ from ..view.QuitDialog import QuitDialog
 from ..view.StartupDialog import StartupDialog
 
 from ..model.session_manager import SessionManager
+from ..model.startup_timer import StartupTimer
 
 from .startup_handler import StartupHandler
 
@@ -15,8 +16,9 @@ from input_mechanism.controller.input_mechanism_controller import InputMechanism
 from config import APP_NAME, INITIAL_PROJECT_NAME
 
 class MainController():
-    def __init__(self, app_window: MainWindow):
+    def __init__(self, app_window: MainWindow, startup_timer: StartupTimer = None):
         self._app_window = app_window
+        self.startup_timer = startup_timer or StartupTimer()
 
         self._app_title = APP_NAME
         self._project_title = INITIAL_PROJECT_NAME
@@ -33,35 +35,52 @@ class MainController():
         self._app_window.quitAppSignal.connect(self._quit_app)
 
     def _startup(self):
-        self._set_app_window_title()
-        self._app_window.show()
+        with self.startup_timer.phase('show'):
+            self._set_app_window_title()
+            self._app_window.show()
 
-        self._init_components()
+        # Components get initialized once a project gets opened or a new one gets created,
+        # so the startup dialog shows up right after the window
+        self._components = None
+        self._are_components_modified = False
 
-        startup_window = StartupDialog(self._app_window)
-        startup_handler = StartupHandler(startup_window, self._load_data)
-        result = startup_handler.startup()
+        with self.startup_timer.phase('startup_dialog'):
+            startup_window = StartupDialog(self._app_window)
+            startup_handler = StartupHandler(startup_window, self._load_data)
+            result = startup_handler.startup()
 
         if result:
             if startup_handler.new_project:
-                self._init_components()
+                # Reset the components if opening of a project failed after loading part of its data
+                if self._components is None or self._are_components_modified:
+                    self._init_components()
             else:
                 self._set_project_title(startup_handler._project_title)
             self._startup_finished = True
-            self._add_components()
+            with self.startup_timer.phase('add_components'):
+                self._add_components()
         else:
             self._startup_finished = False
             self._app_window.close()
 
+        self.startup_timer.finish()
+
     def _init_components(self):
-        self._components = []
-        self._init_input_mechanism_component()
+        with self.startup_timer.phase('init_components'):
+            self._components = []
+            self._are_components_modified = False
+            self._init_input_mechanism_component()
 
     def _add_components(self):
         for component in self._components:
             self._app_window.addComponent(component[0])
 
     def _load_data(self, data):
+        if self._components is None or self._are_components_modified:
+            self._init_components()
+
+        # Loading may fail halfway - the components get reset before the next use
+        self._are_components_modified = True
         for component in self._components:
             component[1].load_data(data)
 
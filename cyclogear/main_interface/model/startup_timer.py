@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import json
+from contextlib import contextmanager
+
+# Set the variable to print the startup timing report to stderr
+STARTUP_REPORT_VARIABLE = 'CYCLOGEAR_STARTUP_REPORT'
+
+class StartupTimer:
+    '''
+    This class measures the duration of the application startup phases.
+    '''
+    def __init__(self, start_time=None):
+        '''
+        Args:
+            start_time (float): time.perf_counter() value the startup began at - the timer creation by default.
+        '''
+        self._start_time = time.perf_counter() if start_time is None else start_time
+        self._phases = {}
+        self._elapsed_time = None
+
+    @contextmanager
+    def phase(self, name):
+        '''
+        Measure the duration of the code in the context as the startup phase.
+
+        Args:
+            name (str): Name of the phase - durations of phases of the same name add up.
+        '''
+        self._phases.setdefault(name, 0)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases[name] += time.perf_counter() - start_time
+
+    def finish(self):
+        '''
+        Stop the timer and print the report if requested with the STARTUP_REPORT_VARIABLE environment variable.
+        '''
+        self._elapsed_time = time.perf_counter() - self._start_time
+        if os.environ.get(STARTUP_REPORT_VARIABLE):
+            sys.stderr.write(json.dumps(self.get_report(), indent=2) + '\n')
+
+    def get_report(self):
+        '''
+        Get the startup timing report.
+
+        Returns:
+            (dict): 'phases' - durations of the phases [ms] in the order they started, 'total' - duration of the whole startup [ms].
+        '''
+        elapsed_time = time.perf_counter() - self._start_time if self._elapsed_time is None else self._elapsed_time
+        return {'phases': {name: round(duration * 1000, 2) for name, duration in self._phases.items()},
+                'total': round(elapsed_time * 1000, 2)}
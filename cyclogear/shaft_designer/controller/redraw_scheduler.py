@@ -0,0 +1,48 @@
+from PyQt6.QtCore import QTimer
+
+import instrumentation
+
+class RedrawScheduler:
+    '''
+    This class coalesces the redraw requests of the shaft designer.
+
+    Requests only mark the regions of the view dirty - all the regions marked within the current
+    event loop turn get redrawn at once, when the control returns to the event loop.
+    '''
+    GEOMETRY = 'geometry'   # Shaft steps
+    LIMITS = 'limits'       # Limits and values of the sidebar subsections
+    BEARINGS = 'bearings'   # Bearings
+    FUNCTIONS = 'functions' # Shaft functions plots
+
+    def __init__(self, redraw_callback):
+        '''
+        Args:
+            redraw_callback (callable): Function redrawing the regions - gets the set of the dirty regions.
+        '''
+        self._redraw_callback = redraw_callback
+        self._dirty_regions = set()
+
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def request(self, *regions):
+        '''
+        Mark the regions dirty and schedule the redraw.
+        '''
+        self._dirty_regions.update(regions)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        '''
+        Redraw the dirty regions immediately.
+        '''
+        self._timer.stop()
+        if not self._dirty_regions:
+            return
+
+        regions, self._dirty_regions = self._dirty_regions, set()
+        instrumentation.count('shaft_designer.redraws')
+        self._redraw_callback(regions)
@@ -4,6 +4,7 @@ from ..view.ShaftSection import ShaftSection, EccentricsSection
 from ..model.shaft_calculator import ShaftCalculator
 from ..model.functions_calculator import FunctionsCalculator
 
+from .redraw_scheduler import RedrawScheduler
 
 from utils.message_handler import MessageHandler
         
@@ -24,8 +25,14 @@ class ShaftDesignerController:
         # Set an instance of shaft calculator
         self.shaft_calculator = ShaftCalculator()
 
-        # Set an instance of functions calculator
-        self.functions_calculator = FunctionsCalculator()
+        # Set an instance of functions calculator - subsections get edited one at a time,
+        # so recalculate only what the edited subsection affects
+        self.functions_calculator = FunctionsCalculator(incremental=True)
+
+        # Set an instance of redraw scheduler - redraw the regions changed by the handled event at once
+        self._redraw_scheduler = RedrawScheduler(self._redraw)
+        self._shaft_plot_attributes = []
+        self._bearings_plot_attributes = {}
     
     def _connect_signals_and_slots(self):
         self._shaft_designer.confirmDraftButton.clicked.connect(self._on_finish_draft)
@@ -53,6 +60,25 @@ class ShaftDesignerController:
 
         self._shaft_designer.setSidebarSections(self._sections)
     
+    def _redraw(self, regions):
+        """
+        Redraw the dirty regions of the shaft designer.
+
+        Args:
+            regions (set): Regions marked dirty since the last redraw.
+        """
+        if RedrawScheduler.GEOMETRY in regions:
+            self._shaft_designer.shaftViewer.draw_shaft(self._shaft_plot_attributes)
+
+        if RedrawScheduler.LIMITS in regions:
+            self._set_sections_limits()
+
+        if RedrawScheduler.BEARINGS in regions:
+            self._shaft_designer.shaftViewer.set_bearings(self._bearings_plot_attributes)
+
+        if RedrawScheduler.FUNCTIONS in regions:
+            self._set_functions_plots(self.functions_calculator.get_shaft_functions())
+
     def _handle_subsection_data(self, shaft_subsection_attributes):
         # Update the shaft drawing
         self._draw_shaft(shaft_subsection_attributes)
@@ -62,30 +88,45 @@ class ShaftDesignerController:
 
         self._enable_add_subsection_button(shaft_subsection_attributes[0])
 
-        # Enable the confirmation of current shaft design
-        self._enable_shaft_design_confirmation()
         self._shaft_designer.setDraftFinishedTitle(False)
                 
     def _draw_shaft(self, shaft_subsection_attributes = None):
-        # Calculate shaft subsections plot attributes and draw them on the chart
-        shaft_plot_attributes = self.shaft_calculator.calculate_shaft_sections(shaft_subsection_attributes)
-        self._shaft_designer.shaftViewer.draw_shaft(shaft_plot_attributes)
+        self._calculate_shaft(shaft_subsection_attributes)
 
-        # Update limits
-        self._set_limits()
+        # Draw them on the chart
+        self._request_shaft_redraw(RedrawScheduler.LIMITS)
+
+    def _calculate_shaft(self, shaft_subsection_attributes = None):
+        # Calculate shaft subsections plot attributes
+        self._shaft_plot_attributes = self.shaft_calculator.calculate_shaft_sections(shaft_subsection_attributes)
+        self._calculate_limits()
 
         # Check if all the limits are met - it can occur when the width of eccentrics
         # or the shaft coordinates get changed
-        meets_limits = self.shaft_calculator._check_if_plots_meet_limits()
-        if not meets_limits:
-            self._draw_shaft()
-
-    def _set_limits(self):
+        while not self.shaft_calculator._check_if_plots_meet_limits():
+            self._shaft_plot_attributes = self.shaft_calculator.calculate_shaft_sections()
+            self._calculate_limits()
+
+    def _request_shaft_redraw(self, *regions):
+        # Enable the confirmation of current shaft design at once, so the button and the remaining functions
+        # are never stale - only the drawing gets deferred. Replot the functions if the remaining ones got recalculated
+        if self._enable_shaft_design_confirmation():
+            regions += (RedrawScheduler.FUNCTIONS,)
+        self._redraw_scheduler.request(RedrawScheduler.GEOMETRY, *regions)
+
+    def _calculate_limits(self):
         current_subsections = {}
         for section_name, section in self._sections.items():
             if section_name != 'Mimośrody':
                 current_subsections[section_name] = [None] * section.subsectionCount
-        limits = self.shaft_calculator.calculate_limits(current_subsections)
+        self.shaft_calculator.calculate_limits(current_subsections)
+
+    def _set_limits(self):
+        self._calculate_limits()
+        self._redraw_scheduler.request(RedrawScheduler.LIMITS)
+
+    def _set_sections_limits(self):
+        limits = self.shaft_calculator.limits
         sections_dimensions = self.shaft_calculator.get_sections_dimensions()
 
         for section_name, section in limits.items():
@@ -99,11 +140,10 @@ class ShaftDesignerController:
         self.shaft_calculator.remove_shaft_subsection(section_name, subsection_number)
 
         # Recalculate and redraw shaft sections
-        shaft_plot_attributes = self.shaft_calculator.calculate_shaft_sections()
-        self._shaft_designer.shaftViewer.draw_shaft(shaft_plot_attributes)
+        self._shaft_plot_attributes = self.shaft_calculator.calculate_shaft_sections()
+        self._request_shaft_redraw()
         
         self._enable_add_subsection_button(section_name)
-        self._enable_shaft_design_confirmation()
         self._shaft_designer.setDraftFinishedTitle(False)
     
     def _enable_sections(self):
@@ -120,6 +160,8 @@ class ShaftDesignerController:
         if self.is_whole_shaft_designed or is_whole_shaft_designed_state_changed:
             self._toogle_remaining_plots_visibility()
             self._shaft_designer.confirmDraftButton.setEnabled(self.is_whole_shaft_designed)
+            return True
+        return False
             
     def _is_whole_shaft_designed_state_changed(self):
         is_whole_shaft_designed_new = self.shaft_calculator.is_whole_shaft_designed()
@@ -132,7 +174,6 @@ class ShaftDesignerController:
     def _toogle_remaining_plots_visibility(self):
         shaft_steps = self.shaft_calculator.get_shaft_attributes()
         self.functions_calculator.calculate_remaining_functions(shaft_steps)
-        self._set_functions_plots(self.functions_calculator.get_shaft_functions())
     
     def _enable_add_subsection_button(self, section_name):
         # Enable add button if the last subsection in the sidebar was plotted - do not allow to add multiple subsections at once
@@ -206,12 +247,11 @@ class ShaftDesignerController:
         # Redraw shaft and recalculate remaining functions
         if self.shaft_calculator.shaft_sections:
             self._draw_shaft()
-            self._enable_shaft_design_confirmation()
             self._shaft_designer.setDraftFinishedTitle(False)
             self.update_bearing_data()
 
         # (Re)draw shaft plots
-        self._set_functions_plots(self.functions_calculator.get_shaft_functions())
+        self._redraw_scheduler.request(RedrawScheduler.FUNCTIONS)
 
     def update_bearing_data(self, bearing_attributes=None):
         """
@@ -221,7 +261,8 @@ class ShaftDesignerController:
             bearing_attributes (dict): single bearing attributes.
         """
         bearings_plot_attributes = self.shaft_calculator.calculate_bearings(bearing_attributes)
-        self._shaft_designer.shaftViewer.set_bearings(bearings_plot_attributes)
+        self._bearings_plot_attributes = bearings_plot_attributes
+        self._redraw_scheduler.request(RedrawScheduler.BEARINGS)
         if bearings_plot_attributes:
             self._shaft_designer._toggleBearingsPlotButton.setEnabled(True)
         else:
@@ -236,8 +277,9 @@ class ShaftDesignerController:
                 if section_name != 'Mimośrody':
                     self._sections[section_name].addSubsection()
                 data = (section_name, int(subsection_number), subsection, None)
-                self._draw_shaft(data)
+                self._calculate_shaft(data)
                 self._enable_sections()
 
-        self._enable_shaft_design_confirmation()
+        # Draw the whole loaded shaft at once
+        self._request_shaft_redraw(RedrawScheduler.LIMITS)
         self._shaft_designer.setDraftFinishedTitle(False)
@@ -1,9 +1,40 @@
 import numpy as np
+from bisect import bisect_right
 from collections import OrderedDict
+from math import comb
 from types import MappingProxyType
 
+import instrumentation
+
 class FunctionsCalculator():
-    def __init__(self):
+    """
+    Calculate the shaft functions (moments, deflection and minimal diameters)
+    along the shaft length.
+
+    Args:
+        sampling (str): 'uniform' - functions are sampled every 0.1 mm,
+                        'adaptive' - functions are sampled at every load, support and
+                        shaft step coordinate and refined only where it is needed.
+        tolerance (float): Maximal deviation of every shaft function from its linear interpolation
+                           between samples in adaptive sampling mode - [mm] for the minimal diameters
+                           and the deflection, [Nm] for the moments. The intervals are not refined below
+                           0.001 mm and the torque step right after L1 not below 0.1 mm. The functions
+                           values are rounded, so the jumps of the rounded values (0.01 mm of the minimal
+                           diameters, and up to about 0.13 mm of d(Mz) close to the zeros of the rounded
+                           bending moment) add to the deviation.
+        incremental (bool): If True, calculate_remaining_functions keeps the deflection integrals
+                            of the shaft part before the first load changed since its previous call
+                            and recalculates only the rest. The results are identical to the full
+                            recalculation, as the integrals are always derived from the current loads.
+    """
+    def __init__(self, sampling='uniform', tolerance=0.02, incremental=False):
+        self._sampling = sampling
+        self._tolerance = tolerance
+        self._incremental = incremental
+        self._interval = 0.1
+        self._min_interval = 0.001
+        self._coarse_interval = 10
+
         self.d_min_by_permissible_deflection_angle = None
         self.d_min_by_permissible_deflection_arrow = None
         self.deflection_arrow = None
@@ -11,6 +42,23 @@ class FunctionsCalculator():
         self._min_diameters = {}
         self._initial_min_diameters = {}
 
+        self._reset_cache()
+
+    def _reset_cache(self):
+        # Intermediate results reused between the calls of calculate_remaining_functions
+        self._previous_shaft_steps = None       # Shaft steps (z, l, d, e) of the previous calculation
+        self._steps_moments_of_inertia = {}     # Moments of inertia of the shaft steps by their (d, e)
+        self._steps_starts_loads = {}           # Bending moment and shear force by the shaft step start coordinate
+        self._macaulay_polynomials = {}         # Segments polynomials of the Macaulay sums by their loads and power
+        self._integrated_loads = []             # Loads the deflection polynomials were derived from
+        self._deflection_polynomials = []       # Coefficients of Φ(z) between the subsequent integrated loads
+        self._deflection_polynomials_arrays = None  # Their coordinates and coefficients as arrays for evaluation
+        self._supports_phi_per_inertia = None   # Φ(z) per unit of the equivalent shaft moment of inertia at the supports
+        self._integrated_z_values = None        # z arguments vector of the integrals below
+        self._psi_per_inertia = None            # ψ(z) and Φ(z) per unit of the equivalent shaft moment of inertia
+        self._phi_per_inertia = None
+
+    @instrumentation.timed('functions.support_reactions')
     def _calculate_support_reactions(self):
         LA = self._data['LA'][0]
         LB =  self._data['LB'][0]
@@ -35,48 +83,116 @@ class FunctionsCalculator():
         self._data['Ra'][0] = self.support_reactions['Fa']['val']
         self._data['Rb'][0] = self.support_reactions['Fb']['val']
 
+    def _get_macaulay_sum(self, loads, z, power):
+        """
+        Calculate the sum of the Macaulay terms of the loads: Σ val * <z - z_load>^power [m].
+
+        The sum is a piecewise polynomial with the segments starting at the loads coordinates.
+        Every z argument is assigned its segment with searchsorted and the segment polynomial,
+        expanded around the segment start, is evaluated with the Horner scheme - so the cost
+        does not grow with the number of loads times the number of z arguments.
+
+        Args:
+            loads (iterable): dicts with the 'z' coordinate [mm] and the 'val' of the load.
+            z (ndarray): z arguments [mm].
+            power (int): Power of the Macaulay terms.
+        Returns:
+            (ndarray): Sum of the Macaulay terms for every z argument.
+        """
+        z = np.asarray(z, dtype=float)
+        positions, coefficients = self._get_macaulay_polynomials(loads, power)
+        if not positions.size:
+            return np.zeros_like(z)
+
+        # Index of the last load acting before z - -1 if there is none
+        segments = np.searchsorted(positions, z, side='right') - 1
+        if power == 0:
+            return coefficients[segments + 1]
+
+        t = (z - positions[segments]) * 0.001
+        result = coefficients[power][segments]
+        for coefficient in reversed(coefficients[:power]):
+            result = result * t + coefficient[segments]
+
+        return np.where(segments >= 0, result, 0)
+
+    def _get_macaulay_polynomials(self, loads, power):
+        # Coordinates of the loads and coefficients of the segments polynomials of their Macaulay sum -
+        # cached by the loads, as the same forces get evaluated for every z arguments vector
+        loads = sorted(loads, key=lambda load: load['z'])
+        key = (tuple((load['z'], load['val']) for load in loads), power)
+        if key in self._macaulay_polynomials:
+            return self._macaulay_polynomials[key]
+
+        positions = np.array([load['z'] for load in loads], dtype=float)
+        values = np.array([load['val'] for load in loads], dtype=float)
+        if power == 0:
+            # Sums of the loads acting before z - preceded by 0 for z before all of them
+            coefficients = np.concatenate(([0], np.cumsum(values)))
+        else:
+            # Coefficients of the segments polynomials in the arm t measured from the segment start:
+            # Σ val * (t + a)^n = Σ_k C(n, k) * t^k * Σ val * a^(n-k), where a are the arms of the acting loads
+            arms = np.tril(positions[:, np.newaxis] - positions) * 0.001
+            is_acting = np.tri(len(positions), dtype=bool)
+            coefficients = [comb(power, k) * np.sum(np.where(is_acting, values * arms**(power - k), 0), axis=1) for k in range(power + 1)]
+
+        self._macaulay_polynomials[key] = positions, coefficients
+        return positions, coefficients
+
     def _bending_moment_at_z(self, forces, z):
-        moment = 0
-        for force in forces.values():
-            if force['z'] <= z:
-                moment += force['val'] * (z - force['z']) * 0.001
-       
-        return moment
+        return self._get_macaulay_sum(forces.values(), z, 1)
     
     def _cutting_force_at_z(self, loads, z):
-        cutting_force = 0
-        for load in loads.values():
-            if load['z'] <= z:
-                cutting_force += load['val']
-        return cutting_force
-    
-    def _psi_at_z(self, loads, z):
-        # Funkcja do obliczania kąta ugięcia w punkcie z - bez stałych całkowania
-        deflection_angle = 0
-        for key, load in loads.items():
-            if load['z'] <= z:
-                if key.startswith('F') or key.startswith('Q'):
-                    deflection_angle += 1 / 2 * load['val'] * ((z - load['z']) * 0.001)**2
-                elif key.startswith('M'):
-                    deflection_angle += load['val'] * ((z - load['z']) * 0.001)
-        return deflection_angle
-    
-    def _phi_at_z(self, loads, z):
-        # Funkcja do obliczania strzałki ugięcia w punkcie z - bez stałych całkowania
-        deflection_arrow = 0
-        for key, load in loads.items():
-            if load['z'] <= z:
-                if key.startswith('F') or key.startswith('Q'):
-                    deflection_arrow += 1 / 6 * load['val'] * ((z - load['z']) * 0.001)**3
-                elif key.startswith('M'):
-                    deflection_arrow += 1 / 2 * load['val'] * ((z - load['z']) * 0.001)**2
-        return deflection_arrow
+        return self._get_macaulay_sum(loads.values(), z, 0)
+
+    def _get_deflection_polynomials(self, loads, start, polynomials):
+        """
+        Derive the coefficients of Φ(z) - the double integral of the bending moment without integration
+        constants - between the subsequent loads.
+
+        Φ(z) is a cubic polynomial in the arm t [m] measured from the last load acting before z. The polynomial
+        of every load gets derived from the previous one - shifted to the load coordinate, with the load added -
+        so it depends only on the loads acting before it and the polynomials of the unchanged leading loads
+        can be kept.
+
+        Args:
+            loads (list): Sorted tuples (z [mm], is_moment, val) of the loads.
+            start (int): Index of the first load to derive the polynomial of.
+            polynomials (list): Coefficients (a0, a1, a2, a3) of the polynomials of the loads before start.
+        Returns:
+            (list): Coefficients of the polynomials of all the loads.
+        """
+        polynomials = polynomials[:start]
+        a0, a1, a2, a3 = polynomials[-1] if polynomials else (0, 0, 0, 0)
+        position = loads[start - 1][0] if start else loads[0][0]
+        for z, is_moment, val in loads[start:]:
+            # Shift the polynomial to the load coordinate
+            h = (z - position) * 0.001
+            a0, a1, a2 = a0 + h * (a1 + h * (a2 + h * a3)), a1 + h * (2 * a2 + 3 * h * a3), a2 + 3 * h * a3
+            # Moments are integrated twice, forces and shear forces increments three times
+            if is_moment:
+                a2 += 1 / 2 * val
+            else:
+                a3 += 1 / 6 * val
+            polynomials.append((a0, a1, a2, a3))
+            position = z
+        return polynomials
+
+    def _evaluate_deflection_polynomials(self, z):
+        # ψ(z) - the derivative of Φ(z) - and Φ(z) per unit of the equivalent shaft moment of inertia,
+        # the first polynomial is zero and covers the shaft before the first load
+        positions, coefficients = self._deflection_polynomials_arrays
+        segments = np.searchsorted(positions, z, side='right') - 1
+        a0, a1, a2, a3 = coefficients[:, segments]
+        t = (z - positions[segments]) * 0.001
+        psi = (3 * a3 * t + 2 * a2) * t + a1
+        phi = ((a3 * t + a2) * t + a1) * t + a0
+        return psi, phi
 
     def _calculate_integration_constants(self):
         LA = self._data['LA'][0]
         LB = self._data['LB'][0]
-        mA = self._phi_at_z(self._all_loads, LA)
-        mB = self._phi_at_z(self._all_loads, LB)
+        mA, mB = self._supports_phi_per_inertia * self._I
 
         LA *= 0.001
         LB *= 0.001
@@ -87,11 +203,11 @@ class FunctionsCalculator():
         return {'C': C, 'D': D}
     
     def _calculate_bending_moment_function(self):
-        self.bending_moment = np.array([self._bending_moment_at_z(self._all_forces, z) for z in self._z_values])
+        self.bending_moment = self._bending_moment_at_z(self._all_forces, self._z_values)
         self.bending_moment = np.around(self.bending_moment, decimals=2)
 
     def _calculate_torque_function(self):
-        self.torque = np.array([self._data['Mwe'][0] if z > self._data['L1'][0] else 0 for z in self._z_values])
+        self.torque = np.where(self._z_values > self._data['L1'][0], self._data['Mwe'][0], 0)
         self.torque = np.around(self.torque, decimals=2)
 
     def _calculate_equivalent_moment_function(self):
@@ -99,6 +215,7 @@ class FunctionsCalculator():
         self.equivalent_moment = np.sqrt(np.power(self.bending_moment, 2) + np.power(reductionFactor / 2 * self.torque, 2))
         self.equivalent_moment = np.around(self.equivalent_moment, decimals=2)
         
+    @instrumentation.timed('functions.dmin.equivalent_stress')
     def _calculate_dmin_function_by_equivalent_stress(self):
         # Calculate minimal shaft diameter based on equivalent stress condition
         Zgo = self._data['Materiał']['z_go'][0] * 10**6
@@ -109,6 +226,7 @@ class FunctionsCalculator():
         self._min_diameters['dMz'] = self.d_min_by_equivalent_stress
         self._initial_min_diameters['dMz'] = self.d_min_by_equivalent_stress
     
+    @instrumentation.timed('functions.dmin.torsional_strength')
     def _calculate_dmin_function_by_torsional_strength(self):
         # Calculate minimal shaft diameter based on torsional strength condition
         Zso = self._data['Materiał']['z_so'][0] * 10**6
@@ -119,6 +237,7 @@ class FunctionsCalculator():
         self._min_diameters['dMs'] = self.d_min_by_torsional_strength
         self._initial_min_diameters['dMs'] = self.d_min_by_torsional_strength
 
+    @instrumentation.timed('functions.dmin.permissible_angle_of_twist')
     def _calculate_dmin_function_by_permissible_angle_of_twist(self):   
         # Calculate minimal shaft diameter d - based permissible angle of twist condition
         G = self._data['Materiał']['g'][0] * 10**6
@@ -146,6 +265,186 @@ class FunctionsCalculator():
 
         return  total_length == self._data['L'][0]
         
+    def _calculate_initial_functions(self):
+        # Calculate functions
+        self._calculate_bending_moment_function()
+        self._calculate_torque_function()
+        self._calculate_equivalent_moment_function()
+
+        # calculate d min by different conditions
+        self._calculate_dmin_function_by_torsional_strength()
+        self._calculate_dmin_function_by_equivalent_stress()
+        self._calculate_dmin_function_by_permissible_angle_of_twist()
+
+        functions = [self.bending_moment, self.torque, self.equivalent_moment]
+        min_diameters = [self.d_min_by_torsional_strength, self.d_min_by_equivalent_stress, self.d_min_by_permissible_angle_of_twist]
+        return functions, min_diameters, [self.bending_moment]
+
+    def _calculate_all_functions(self):
+        functions, min_diameters, signed_functions = self._calculate_initial_functions()
+        self._calculate_deflection_functions()
+
+        return (functions + [self.deflection_arrow],
+                min_diameters + [self.d_min_by_permissible_deflection_angle, self.d_min_by_permissible_deflection_arrow],
+                signed_functions + [self.deflection_angle, self.deflection_arrow])
+
+    def _get_breakpoints(self):
+        # Coordinates at which the functions change their formula - they are always sampled exactly
+        L = self._data['L'][0]
+        L1 = self._data['L1'][0]
+        breakpoints = [0, L, self._data['LA'][0], self._data['LB'][0]] + self._eccentrics_positions
+        # Torque function steps right after L1
+        breakpoints += [L1, min(L1 + self._interval, L)]
+        # Add the shaft steps starts and ends
+        breakpoints += [step['z'] for step in self._shaft_steps] + [step['z'] + step['l'] for step in self._shaft_steps]
+
+        return np.unique(np.clip(np.array(breakpoints, dtype=float), 0, L))
+
+    def _get_cusps(self, z_values, include_deflection):
+        """
+        Find the coordinates the minimal diameters functions drop to zero at - the supports, the zeros of the bending
+        moment before the torque is applied and the zeros of the deflection angle and of the deflection between the supports.
+
+        Args:
+            z_values (ndarray): z arguments vector the deflection is checked for the changes of its sign at.
+            include_deflection (bool): Whether the zeros of the deflection angle and of the deflection are included.
+        Returns:
+            (ndarray): Coordinates of the cusps.
+        """
+        L = self._data['L'][0]
+        L1 = self._data['L1'][0]
+        LA = self._data['LA'][0]
+        LB = self._data['LB'][0]
+        cusps = [np.array([LA, LB], dtype=float)]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # The bending moment is linear between the forces
+            positions, (c0, c1) = self._get_macaulay_polynomials(self._all_forces.values(), 1)
+            roots = positions - c0 / c1 * 1000
+            cusps.append(roots[(positions <= roots) & (roots < np.append(positions[1:], L)) & (roots <= L1)])
+            if not include_deflection:
+                return np.concatenate(cusps)
+
+            self._update_deflection_polynomials()
+            self.constants = self._calculate_integration_constants()
+            C, D = self.constants['C'], self.constants['D']
+
+            # The deflection angle multiplied by EI is quadratic between the loads: I * ψ(t) / I + C = A * t^2 + B * t + C0
+            positions, (a0, a1, a2, a3) = self._deflection_polynomials_arrays
+            A, B, C0 = 3 * a3 * self._I, 2 * a2 * self._I, a1 * self._I + C
+            discriminant = np.sqrt(B**2 - 4 * A * C0)
+            arms = np.where(A != 0, [(-B - discriminant) / (2 * A), (-B + discriminant) / (2 * A)], -C0 / B)
+            lengths = (np.append(positions[1:], L) - positions) * 0.001
+            # The zeros at the ends of the segments get accepted with the rounding slack of the arms
+            slack = self._min_interval * 0.001
+            cusps.append((positions + arms * 1000)[(-slack <= arms) & (arms <= lengths + slack)])
+
+            # The deflection is cubic - its zeros get found with the Newton method, starting from the linear
+            # interpolation between the z arguments it changes its sign between
+            def get_deflection(z):
+                # Deflection and the deflection angle multiplied by EI
+                psi, phi = self._evaluate_deflection_polynomials(z)
+                return phi * self._I + C * z * 0.001 + D, psi * self._I + C
+
+            z = z_values[(LA < z_values) & (z_values < LB)]
+            deflection, _ = get_deflection(z)
+            is_root = deflection[:-1] * deflection[1:] < 0
+            starts, ends = z[:-1][is_root], z[1:][is_root]
+            roots = starts + (ends - starts) * deflection[:-1][is_root] / (deflection[:-1][is_root] - deflection[1:][is_root])
+            for _ in range(3):
+                deflection, angle = get_deflection(roots)
+                roots = np.clip(roots - deflection / angle * 1000, starts, ends)
+            cusps.append(roots)
+
+        return np.concatenate(cusps)
+
+    def _sample_functions(self, calculate_functions, z_values):
+        # Calculate the functions at the z arguments - they get stacked into the checked functions
+        # with the envelope of the minimal diameters functions, and the minimal diameters functions
+        self._z_values = z_values
+        functions, min_diameters, _ = calculate_functions()
+        return np.stack(functions + min_diameters + [np.max(np.stack(min_diameters), axis=0)]), np.stack(min_diameters)
+
+    def _create_adaptive_z_values(self, include_deflection):
+        """
+        Create z arguments vector containing the breakpoints of the functions and the cusps of the minimal diameters
+        functions, sampled every coarse interval and subdivided so none of the functions deviates from its linear
+        interpolation by more than the set tolerance.
+
+        The functions get calculated at the midpoints of all the intervals at once. The functions are smooth between
+        the breakpoints, so the deviation at the midpoint falls with the square of the interval length - the intervals
+        get split into as many equal subintervals as that deviation needs. The minimal diameters grow like |x|^(1/4)
+        or |x|^(1/3) from the cusps instead, so the intervals next to them get graded like (j / n)^8 from the cusp,
+        which spreads the deviation evenly, with n following from the growth of the minimal diameters over the interval.
+
+        Args:
+            include_deflection (bool): Whether the deflection functions are calculated too.
+        Returns:
+            (ndarray): z arguments vector.
+        """
+        calculate_functions = self._calculate_all_functions if include_deflection else self._calculate_initial_functions
+        L = self._data['L'][0]
+        L1 = self._data['L1'][0]
+
+        z_values = np.union1d(self._get_breakpoints(), np.arange(0, L, self._coarse_interval))
+        cusps = np.unique(self._get_cusps(z_values, include_deflection))
+        # The torque step right after L1 is a discontinuity, so its interval is never split
+        is_sampled = lambda z: (0 <= z) & (z <= L) & ~((L1 < z) & (z < L1 + self._interval))
+        z_values = np.concatenate((z_values, cusps))
+        z_values = np.unique(z_values[is_sampled(z_values)])
+        starts, ends = z_values[:-1], z_values[1:]
+        midpoints = 0.5 * (starts + ends)
+
+        # Calculate functions at the intervals ends and midpoints at once
+        values, min_diameters = self._sample_functions(calculate_functions, np.concatenate((z_values, midpoints)))
+        ends_number = len(z_values)
+        deviation = np.abs(values[:, ends_number:] - 0.5 * (values[:, :ends_number - 1] + values[:, 1:ends_number])).max(axis=0)
+        growth = np.abs(min_diameters[:, 1:ends_number] - min_diameters[:, :ends_number - 1]).max(axis=0)
+
+        # Distances of the intervals ends from the nearest cusp - the intervals lie on one side of it, as the cusps are sampled
+        nearest = np.clip(np.searchsorted(cusps, midpoints), 1, len(cusps) - 1)
+        nearest = cusps[np.where(midpoints - cusps[nearest - 1] <= cusps[nearest] - midpoints, nearest - 1, nearest)]
+        nearer, farther = np.sort(np.abs(np.stack((starts, ends)) - nearest), axis=0)
+
+        # Smooth functions deviate with the square of the interval length, so n subintervals reduce the deviation n^2 times.
+        # The minimal diameters growing like (x / farther)^(1/4) from the cusp need n subintervals evenly spaced
+        # in x^(1/8) - n^2 * tol / 2 for the growth up from the cusp, fewer the farther the interval lies from it
+        ratios = (nearer / farther)**(1 / 8)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            graded_subintervals = np.nan_to_num(np.sqrt(2 * growth / (self._tolerance * (1 - ratios**2))) * (1 - ratios))
+        subintervals = np.ceil(np.maximum(np.sqrt(deviation / self._tolerance), graded_subintervals))
+        subintervals = np.minimum(subintervals, np.ceil((ends - starts) / self._min_interval))
+        subintervals = np.where(is_sampled(midpoints), np.maximum(subintervals, 1), 1).astype(int)
+
+        # Inner points of the subdivided intervals
+        counts = subintervals - 1
+        intervals = np.repeat(np.arange(len(counts)), counts)
+        fractions = (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1) / subintervals[intervals]
+        nearer, farther, nearest = nearer[intervals], farther[intervals], nearest[intervals]
+        distances = (nearer**(1 / 8) + (farther**(1 / 8) - nearer**(1 / 8)) * fractions)**8
+        inner_points = np.where(starts[intervals] >= nearest, nearest + distances, nearest - distances)[distances >= self._min_interval]
+
+        # The envelope of the minimal diameters has kinks where the largest of them changes - sample them too,
+        # at the crossings of the linear interpolations of the largest ones between the samples
+        samples = np.empty(2 * ends_number - 1)
+        samples[0::2], samples[1::2] = z_values, midpoints
+        samples_min_diameters = np.empty((len(min_diameters), len(samples)))
+        samples_min_diameters[:, 0::2], samples_min_diameters[:, 1::2] = min_diameters[:, :ends_number], min_diameters[:, ends_number:]
+        largest = samples_min_diameters.argmax(axis=0)
+        crossings = np.flatnonzero(largest[:-1] != largest[1:])
+        before = samples_min_diameters[largest[crossings], crossings] - samples_min_diameters[largest[crossings + 1], crossings]
+        after = samples_min_diameters[largest[crossings + 1], crossings + 1] - samples_min_diameters[largest[crossings], crossings + 1]
+        crossings = (samples[crossings] + (samples[crossings + 1] - samples[crossings]) * before / (before + after))[before + after > 0]
+
+        return np.unique(np.concatenate((z_values, inner_points, crossings[is_sampled(crossings)])))
+
+    def _resample_functions(self, include_deflection):
+        # Recreate the adaptive z arguments vector - so it includes the shaft steps coordinates -
+        # and recalculate the initial functions for it
+        self._z_values = self._create_adaptive_z_values(include_deflection)
+        self._calculate_initial_functions()
+
+    @instrumentation.timed('functions.initial_functions')
     def calculate_initial_functions_and_attributes(self, data):
         self._data = data
         # Extract necessary data
@@ -162,96 +461,176 @@ class FunctionsCalculator():
         for forces in (self.active_forces, self.support_reactions): self._all_forces.update(forces)
         self._all_forces = OrderedDict(sorted(self._all_forces.items(), key=lambda x: x[1]['z']))
 
-        # Create z arguments vector
-        interval = 0.1
-        self._z_values = np.arange(0,L + interval, interval)
+        self._shaft_steps = []
+        self._reset_cache()
 
-        # Calculate functions
-        self._calculate_bending_moment_function()
-        self._calculate_torque_function()
-        self._calculate_equivalent_moment_function()
+        # Create z arguments vector and calculate functions
+        if self._sampling == 'adaptive':
+            self._z_values = self._create_adaptive_z_values(False)
+        else:
+            self._z_values = np.arange(0,L + self._interval, self._interval)
+
+        self._calculate_initial_functions()
 
-        # calculate d min by different conditions
-        self._calculate_dmin_function_by_torsional_strength()
-        self._calculate_dmin_function_by_equivalent_stress()
-        self._calculate_dmin_function_by_permissible_angle_of_twist()
-        
         # calculate d min by all initial conditions
         self.d_min = np.max(np.stack(list(function for function in self._initial_min_diameters.values() if function is not None)), axis=0)
 
         self._calculate_minimal_shaft_diameter()
         
+    def _calculate_equivalent_forces(self):
+        # Calculate the diameter and the moment of inertia of the equivalent smooth shaft
+        d = sum(step['l'] * step['d'] for step in self._shaft_steps)/(sum(step['l'] for step in self._shaft_steps))
+        self._E = self._data['Materiał']['e'][0] * 10**6
+        self._I = np.pi * (d * 0.001)**4 / 64
+        self._EI = self._E * self._I
+        # Calculate coefficients k=I/Ij for every shaft step
+        for step in self._shaft_steps:
+            step['k'] = self._I /  self._get_step_moment_of_inertia(step)
+        # Find the shaft steps the forces are applied to - the equivalent forces acting on the equivalent
+        # smooth shaft are the forces scaled by the coefficients of these steps
+        steps_starts = [step['z'] for step in self._shaft_steps[1:]]
+        self._forces_steps = {}
+        for key, force in self._all_forces.items():
+            self._forces_steps[key] = self._shaft_steps[bisect_right(steps_starts, force['z'])]
+
+    def _get_step_moment_of_inertia(self, step):
+        # The moment of inertia depends only on the step diameter and eccentricity
+        key = (step['d'], step['e'])
+        if key not in self._steps_moments_of_inertia:
+            self._steps_moments_of_inertia[key] = np.pi * (step['d'] * 0.001)**4 / 64 + (np.pi * step['d']**2 * step['e']**2) / 4
+        return self._steps_moments_of_inertia[key]
+
+    def _calculate_load_increments(self):
+        # Calculate the increments of bending moments and shear forces acting at the beginning of each shaft step (j)
+        # Coordinates of the shaft steps starts n + 1 = j
+        steps_starts = [step['z'] for step in self._shaft_steps[1:]]
+        # Bending moments and shear forces depend only on the coordinates, so calculate them only for new ones
+        new_steps_starts = np.array([lj for lj in steps_starts if lj not in self._steps_starts_loads], dtype=float)
+        if new_steps_starts.size:
+            bending_moments = self._bending_moment_at_z(self._all_forces, new_steps_starts)
+            cutting_forces = self._cutting_force_at_z(self._all_forces, new_steps_starts)
+            for lj, bending_moment, cutting_force in zip(new_steps_starts, bending_moments, cutting_forces):
+                self._steps_starts_loads[lj] = (bending_moment, cutting_force)
+
+        # Combine the equivalent forces with the increments of bending moments and shear forces into the loads
+        # (z, is_moment, val) sorted by their coordinates. The loads are taken per unit of the equivalent shaft
+        # moment of inertia - k/I = 1/Ij - so a change of one shaft step changes only the loads acting on it
+        # and at its ends
+        loads = []
+        for key, force in self._all_forces.items():
+            loads.append((force['z'], False, force['val'] / self._get_step_moment_of_inertia(self._forces_steps[key])))
+        for idx, lj in enumerate(steps_starts):
+            bending_moment, cutting_force = self._steps_starts_loads[lj]
+            inertia_gain = 1 / self._get_step_moment_of_inertia(self._shaft_steps[idx+1]) - 1 / self._get_step_moment_of_inertia(self._shaft_steps[idx])
+            loads.append((lj, True, bending_moment * inertia_gain))
+            loads.append((lj, False, cutting_force * inertia_gain))
+        self._all_loads = sorted(loads, key=lambda load: load[0])
+
+    def _update_deflection_polynomials(self):
+        """
+        Derive the deflection polynomials of the current loads. The polynomials of the loads before the first
+        changed one are kept - they are derived from the same loads, so they are identical to the recalculated ones.
+
+        Returns:
+            (float): Coordinate of the first load added, removed or changed since the previous derivation,
+                     None if the loads did not change.
+        """
+        loads = self._all_loads
+        integrated_loads = self._integrated_loads
+        start = 0
+        while start < min(len(loads), len(integrated_loads)) and loads[start] == integrated_loads[start]:
+            start += 1
+        if start == max(len(loads), len(integrated_loads)):
+            return None
+
+        self._deflection_polynomials = self._get_deflection_polynomials(loads, start, self._deflection_polynomials)
+        self._integrated_loads = list(loads)
+        # The first polynomial is zero and covers the shaft before the first load
+        self._deflection_polynomials_arrays = (np.array([0] + [load[0] for load in loads], dtype=float),
+                                               np.array([(0, 0, 0, 0)] + self._deflection_polynomials, dtype=float).T.copy())
+        _, self._supports_phi_per_inertia = self._evaluate_deflection_polynomials(np.array([self._data['LA'][0], self._data['LB'][0]], dtype=float))
+
+        return min(load[0] for load in (loads[start:start+1] + integrated_loads[start:start+1]))
+
+    def _update_deflection_integrals(self):
+        """
+        Update ψ(z) and Φ(z) per unit of the equivalent shaft moment of inertia for the current loads.
+
+        In incremental mode the integrals before the coordinate of the first changed load are kept,
+        unless the z arguments vector changed - they depend only on the unchanged loads.
+
+        Returns:
+            (tuple): ψ(z) and Φ(z) arrays.
+        """
+        changed_position = self._update_deflection_polynomials()
+        z = self._z_values
+
+        if not self._incremental or self._integrated_z_values is not z:
+            # Integrate for all the z arguments
+            self._integrated_z_values = z
+            self._psi_per_inertia, self._phi_per_inertia = self._evaluate_deflection_polynomials(z)
+        elif changed_position is not None:
+            z_start = np.searchsorted(z, changed_position, side='left')
+            self._psi_per_inertia[z_start:], self._phi_per_inertia[z_start:] = self._evaluate_deflection_polynomials(z[z_start:])
+
+        return self._psi_per_inertia * self._I, self._phi_per_inertia * self._I
+
+    @instrumentation.timed('functions.deflection_integration')
+    def _calculate_deflection_functions(self):
+        LA = self._data['LA'][0]
+        LB = self._data['LB'][0]
+        teta_dop = self._data['tetadop'][0]
+        f_dop = self._data['fdop'][0]
+        E = self._E
+        # Calculate the function ψ(z) (psi) - the integral of the bending moment, 
+        # and Φ(z) (phi) - the double integral of the bending moment (but without integration constants)
+        psi, phi = self._update_deflection_integrals()
+        # Calculate the angle θ(z) (theta) and the deflection curve f(z)
+        # First, calculate the integration constants
+        self.constants = self._calculate_integration_constants()
+        C = self.constants['C']
+        D = self.constants['D']
+        # Add the integration constants to ψ(z) and Φ(z) - to obtain the integral and the double integral
+        integral = psi + C
+        double_integral = phi + C * self._z_values * 0.001 + D
+        self.deflection_angle = integral / self._EI
+        self.deflection_arrow = double_integral / self._EI * 1000
+        ## Calculate the minimum diameters with respect to the angle θ(z) (theta) and the deflection curve f(z)
+        self.d_min_by_permissible_deflection_angle = (64 / (np.pi * E * teta_dop) * np.sqrt(integral**2))**(1 / 4) * 1000
+        self.d_min_by_permissible_deflection_angle = np.ceil(self.d_min_by_permissible_deflection_angle * 100) / 100
+
+        is_between_supports = (LA <= self._z_values) & (self._z_values <= LB)
+        self.d_min_by_permissible_deflection_arrow = np.where(is_between_supports, (64 / (np.pi * E * f_dop * 0.001) * np.sqrt(double_integral**2))**(1 / 4) * 1000, 0)
+        self.d_min_by_permissible_deflection_arrow = np.ceil(self.d_min_by_permissible_deflection_arrow * 100) / 100
+
+    @instrumentation.timed('functions.remaining_functions')
     def calculate_remaining_functions(self, shaft_steps):
+        steps = [(step['z'], step['l'], step['d'], step['e']) for step in shaft_steps]
+        if self._incremental and steps == self._previous_shaft_steps:
+            # Nothing changed since the previous calculation
+            return
+        self._previous_shaft_steps = steps
+
         self._shaft_steps = shaft_steps
         if self._check_if_whole_shaft_designed():
-            L = self._data['L'][0]
-            LA = self._data['LA'][0]
-            LB = self._data['LB'][0]
-            teta_dop = self._data['tetadop'][0]
-            f_dop = self._data['fdop'][0]
-            # Calculate the diameter and the moment of inertia of the equivalent smooth shaft
-            d = sum(step['l'] * step['d'] for step in self._shaft_steps)/(sum(step['l'] for step in self._shaft_steps))
-            E = self._data['Materiał']['e'][0] * 10**6
-            I = np.pi * (d * 0.001)**4 / 64
-            EI = E * I
-            # Calculate coefficients k=I/Ij for every shaft step
-            for step in self._shaft_steps:
-                Ij = np.pi * (step['d'] * 0.001)**4 / 64 + (np.pi * step['d']**2 * step['e']**2) / 4
-                step['k'] = I /  Ij
-            # Calculate equivalent forces acting on equivalent smooth shaft
-            self._updated_forces = {}
-            for key, force in self._all_forces.items():
-                for idx in range(len(self._shaft_steps)):
-                    if idx == len(self._shaft_steps) - 1 or force['z'] < self._shaft_steps[idx+1]['z']:
-                        self._updated_forces[key] = {'z': force['z'], 'val': force['val'] * self._shaft_steps[idx]['k']}
-                        break
-            # Calculate the increments of bending moments and shear forces acting at the beginning of each shaft step (j)
-            self._moment_gains = {}
-            self._cutting_force_gains = {}
-            for idx, step in enumerate(self._shaft_steps[:-1]):
-                # Coordinate of the shaft step start n + 1 = j
-                lj = self._shaft_steps[idx+1]['z']
-                # Increment of bending moment
-                bending_moment = self._bending_moment_at_z(self._all_forces, lj)
-                deltaM = {'z': lj, 'val': bending_moment * (self._shaft_steps[idx+1]['k'] - self._shaft_steps[idx]['k'])}
-                self._moment_gains[f'M{idx+1}'] = deltaM
-                # increment of shear force
-                cutting_force = self._cutting_force_at_z(self._all_forces, lj)
-                deltaQ = {'z': lj, 'val': cutting_force * (self._shaft_steps[idx+1]['k'] - self._shaft_steps[idx]['k'])}
-                self._cutting_force_gains[f'Q{idx+1}'] = deltaQ
-                # Add the increments of bending moments and shear forces to the remaining forces
-                self._all_loads = {}
-                for loads in (self._updated_forces, self._moment_gains, self._cutting_force_gains): self._all_loads.update(loads)
-                self._all_loads = OrderedDict(sorted(self._all_loads.items(), key=lambda x: x[1]['z']))
-                # Calculate the function ψ(z) (psi) - the integral of the bending moment, 
-                # and Φ(z) (phi) - the double integral of the bending moment (but without integration constants)
-                psi = np.array([self._psi_at_z(self._all_loads, z)  for z in self._z_values])
-                phi = np.array([(self._phi_at_z(self._all_loads, z)) for z in self._z_values])
-            # Calculate the angle θ(z) (theta) and the deflection curve f(z)
-            # First, calculate the integration constants
-            self.constants = self._calculate_integration_constants()
-            C = self.constants['C']
-            D = self.constants['D']
-            # Add the integration constants to ψ(z) and Φ(z) - to obtain the integral and the double integral
-            integral = psi + C
-            double_integral = np.array([phi_at_z + C * z * 0.001 + D for z, phi_at_z in zip(self._z_values, phi)])
-            self.deflection_angle = integral / EI
-            self.deflection_arrow = double_integral / EI * 1000
-            ## Calculate the minimum diameters with respect to the angle θ(z) (theta) and the deflection curve f(z)
-            self.d_min_by_permissible_deflection_angle = (64 / (np.pi * E * teta_dop) * np.sqrt(integral**2))**(1 / 4) * 1000
-            self.d_min_by_permissible_deflection_angle = np.ceil(self.d_min_by_permissible_deflection_angle * 100) / 100
-
-            self.d_min_by_permissible_deflection_arrow = [] 
-            for z, di_at_z in zip(self._z_values, double_integral):
-                if LA <= z <= LB:
-                    self.d_min_by_permissible_deflection_arrow.append((64 / (np.pi * E * f_dop * 0.001) * np.sqrt(di_at_z**2))**(1 / 4) * 1000)
-                else:
-                    self.d_min_by_permissible_deflection_arrow.append(0)
-            self.d_min_by_permissible_deflection_arrow = np.array(self.d_min_by_permissible_deflection_arrow)
-            self.d_min_by_permissible_deflection_arrow = np.ceil(self.d_min_by_permissible_deflection_arrow * 100) / 100
+            # The deflection is calculated in stages, each of them run once per call:
+            # equivalent smooth shaft forces, load increments at the shaft steps and integration
+            with instrumentation.timer('functions.stages.equivalent_forces'):
+                self._calculate_equivalent_forces()
+            with instrumentation.timer('functions.stages.load_increments'):
+                self._calculate_load_increments()
+            if self._sampling == 'adaptive':
+                with instrumentation.timer('functions.stages.sampling'):
+                    self._resample_functions(True)
+            with instrumentation.timer('functions.stages.integration'):
+                self._calculate_deflection_functions()
 
             self._calculate_minimal_shaft_diameter()
         else:
+            if self._sampling == 'adaptive':
+                with instrumentation.timer('functions.stages.sampling'):
+                    self._resample_functions(False)
+
             self.d_min_by_permissible_deflection_angle = None
             self.d_min_by_permissible_deflection_arrow = None
             self.deflection_arrow = None
@@ -260,7 +639,122 @@ class FunctionsCalculator():
         self._min_diameters['dfdop'] = self.d_min_by_permissible_deflection_arrow
 
         self._calculate_dmin_function_by_all_conditions()
-        
+
+    def _get_macaulay_terms(self, positions, z, power):
+        # (z - position)^power [m] for z past the position, 0 otherwise - for every position (rows) and z (columns)
+        positions = np.asarray(positions, dtype=float)[:, np.newaxis]
+        is_loaded = positions <= z
+        if power == 0:
+            return is_loaded.astype(float)
+        return np.where(is_loaded, ((z - positions) * 0.001)**power, 0)
+
+    def calculate_load_cases(self, load_cases):
+        """
+        Calculate the shaft functions for multiple load cases at once.
+
+        Every load case overrides the chosen input values of the current data, the rest
+        (geometry, material, permissible values and the shaft steps set with the last call of
+        calculate_remaining_functions) is shared by all of them. The functions are calculated
+        for the current z arguments vector.
+
+        Args:
+            load_cases (list): dicts with any of the keys: 'Mwe' [Nm], 'Fwzx', 'Fwzy', 'Fwm' [N], 'e' [mm].
+        Returns:
+            (dict): 'z' - z arguments vector (N),
+                    'Mg', 'Ms', 'Mz', 'f', 'dMs', 'dMz', 'dqdop', 'dkdop', 'dfdop', 'dmin' - (K x N) arrays of the functions
+                    for K load cases ('f', 'dkdop' and 'dfdop' are None if the shaft is not designed),
+                    'dmin_envelope' - (N) minimal diameter satisfying all load cases,
+                    'dsc', 'dec' - (K) calculated shaft and eccentrics diameters.
+        """
+        def get_values(key):
+            return np.array([load_case.get(key, self._data[key][0]) for load_case in load_cases], dtype=float)[:, np.newaxis]
+
+        z = self._z_values
+        LA, LB = self._data['LA'][0], self._data['LB'][0]
+        L1 = self._data['L1'][0]
+        Mwe, e = get_values('Mwe'), get_values('e')
+
+        # Active forces alternate their direction on the subsequent eccentrics
+        F = np.sqrt(get_values('Fwzx')**2 + (get_values('Fwm') - get_values('Fwzy'))**2)
+        positions = np.array(self._eccentrics_positions, dtype=float)
+        active_forces = F * (-1)**np.arange(len(positions))
+
+        # Calculate support reactions for every load case
+        RB = -np.sum(active_forces * (positions - LA), axis=1, keepdims=True) / (LB - LA)
+        RA = -np.sum(active_forces, axis=1, keepdims=True) - RB
+        forces_positions = np.concatenate([positions, [LA, LB]])
+        forces = np.hstack([active_forces, RA, RB])
+
+        # Calculate moments functions
+        bending_moment = np.around(forces @ self._get_macaulay_terms(forces_positions, z, 1), decimals=2)
+        torque = np.around(np.where(z > L1, Mwe, 0), decimals=2)
+        equivalent_moment = np.around(np.sqrt(bending_moment**2 + (np.sqrt(3) / 2 * torque)**2), decimals=2)
+
+        # Calculate minimal diameters by the initial conditions
+        material = self._data['Materiał']
+        xz = self._data['xz'][0]
+        kgo = material['z_go'][0] * 10**6 / xz
+        kso = material['z_so'][0] * 10**6 / xz
+        G = material['g'][0] * 10**6
+        E = material['e'][0] * 10**6
+        functions = {
+            'dMs': np.ceil(np.power(16 * torque / (np.pi * kso), 1 / 3) * 1000 * 100) / 100,
+            'dMz': np.ceil(np.power(32 * equivalent_moment / (np.pi * kgo), 1 / 3) * 1000 * 100) / 100,
+            'dqdop': np.ceil(np.sqrt(32 * torque / (np.pi * G * self._data['qdop'][0])) * 1000 * 100) / 100,
+        }
+        dsc = np.max(np.hstack([function.max(axis=1, keepdims=True) for function in functions.values()]), axis=1)
+
+        deflection_arrow = None
+        functions['dkdop'] = functions['dfdop'] = None
+        if self._shaft_steps and self._check_if_whole_shaft_designed():
+            steps = self._shaft_steps
+            # Calculate the coefficients k=I/Ij of the equivalent smooth shaft - eccentricity changes with load case
+            d = sum(step['l'] * step['d'] for step in steps) / sum(step['l'] for step in steps)
+            I = np.pi * (d * 0.001)**4 / 64
+            steps_d = np.array([step['d'] for step in steps], dtype=float)
+            steps_e = np.where(np.array([step['e'] for step in steps]) != 0, e, 0)
+            k = I / (np.pi * (steps_d * 0.001)**4 / 64 + (np.pi * steps_d**2 * steps_e**2) / 4)
+
+            # Calculate equivalent forces and the load increments at the shaft steps starts
+            steps_starts = [step['z'] for step in steps[1:]]
+            forces_steps = [bisect_right(steps_starts, position) for position in forces_positions]
+            equivalent_forces = forces * k[:, forces_steps]
+            k_gains = np.diff(k, axis=1)
+            moment_gains = (forces @ self._get_macaulay_terms(forces_positions, np.array(steps_starts), 1)) * k_gains
+            cutting_force_gains = (forces @ self._get_macaulay_terms(forces_positions, np.array(steps_starts), 0)) * k_gains
+
+            # Integrate the loads - forces and shear forces increments are integrated like forces, moments like moments
+            point_loads = np.hstack([equivalent_forces, cutting_force_gains])
+            point_loads_positions = np.concatenate([forces_positions, steps_starts])
+            def integrate(z, psi_powers=(2, 1), phi_powers=(3, 2)):
+                psi = 1 / 2 * point_loads @ self._get_macaulay_terms(point_loads_positions, z, psi_powers[0]) + moment_gains @ self._get_macaulay_terms(steps_starts, z, psi_powers[1])
+                phi = 1 / 6 * point_loads @ self._get_macaulay_terms(point_loads_positions, z, phi_powers[0]) + 1 / 2 * moment_gains @ self._get_macaulay_terms(steps_starts, z, phi_powers[1])
+                return psi, phi
+            psi, phi = integrate(z)
+            _, phi_at_supports = integrate(np.array([LA, LB], dtype=float))
+            C = (phi_at_supports[:, 1:] - phi_at_supports[:, :1]) / ((LA - LB) * 0.001)
+            D = -phi_at_supports[:, 1:] - C * LB * 0.001
+
+            integral = psi + C
+            double_integral = phi + C * z * 0.001 + D
+            deflection_arrow = double_integral / (E * I) * 1000
+            functions['dkdop'] = np.ceil((64 / (np.pi * E * self._data['tetadop'][0]) * np.abs(integral))**(1 / 4) * 1000 * 100) / 100
+            is_between_supports = (LA <= z) & (z <= LB)
+            functions['dfdop'] = np.ceil(np.where(is_between_supports, (64 / (np.pi * E * self._data['fdop'][0] * 0.001) * np.abs(double_integral))**(1 / 4) * 1000, 0) * 100) / 100
+
+        d_min = np.max(np.stack([function for function in functions.values() if function is not None]), axis=0)
+
+        return {'z': z,
+                'Mg': bending_moment,
+                'Ms': torque,
+                'Mz': equivalent_moment,
+                'f': deflection_arrow,
+                **functions,
+                'dmin': d_min,
+                'dmin_envelope': d_min.max(axis=0),
+                'dsc': dsc,
+                'dec': dsc + 2 * e[:, 0]}
+
     def get_shaft_functions(self):
         functions = {'z': self._z_values,
                     'f(z)':{'Mg': MappingProxyType({'label': ('M<sub>g</sub>(z)', r'M_g(z)'), 'description': 'Moment gnący', 'unit': 'Nm', 'color': '#1ABC9C', 'multiplier': 1, 'decimals': 2, 'function': self.bending_moment}),
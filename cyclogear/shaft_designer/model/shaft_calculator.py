@@ -1,9 +1,12 @@
+import instrumentation
+
 class ShaftCalculator:
     def __init__(self):
         self.shaft_sections = {}
         self.bearings = {}
         self.limits = {}
 
+    @instrumentation.timed('shaft.calculate_shaft_sections')
     def calculate_shaft_sections(self, shaft_subsection_attributes = None):
         # Save subsection attrbutes
         self._save_shaft_sections_attributes(shaft_subsection_attributes)
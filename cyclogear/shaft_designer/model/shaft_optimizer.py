@@ -0,0 +1,246 @@
+import copy
+import time
+import numpy as np
+
+from .shaft_calculator import ShaftCalculator
+
+# Preferred numbers series R40 (PN-ISO 3) for the range 10 - 100 mm
+R40_SERIES = [10, 10.6, 11.2, 11.8, 12.5, 13.2, 14, 15, 16, 17, 18, 19, 20, 21.2, 22.4, 23.6, 25, 26.5, 28, 30,
+              31.5, 33.5, 35.5, 37.5, 40, 42.5, 45, 47.5, 50, 53, 56, 60, 63, 67, 71, 75, 80, 85, 90, 95, 100]
+
+class ShaftOptimizer:
+    """
+    Propose a stepped shaft of minimal mass that satisfies the minimal diameter by all conditions.
+
+    The eccentrics steps have the width of the eccentrics - only the gap between the first two eccentrics
+    has its own section, so the eccentrics next to the further gaps get widened to close them. The other
+    shaft sections get divided into at most max_steps steps each - the division and the steps diameters
+    are chosen by dynamic programming over the breakpoints spaced every length_step. As the deflection conditions depend on the designed
+    shaft itself, the shaft is redesigned with the minimal diameters of the previous design until
+    the design does not change anymore.
+    """
+    def __init__(self, functions_calculator, diameter_series=R40_SERIES, length_step=1, min_step_length=5, max_steps=3, max_iterations=20):
+        """
+        Args:
+            functions_calculator (FunctionsCalculator): Calculator with the initial functions calculated for the shaft data.
+            diameter_series (list): Diameters [mm] the steps diameters get snapped to - diameters above the series get rounded up to whole millimeters.
+            length_step (float): Spacing [mm] of the possible steps breakpoints.
+            min_step_length (float): Minimal length [mm] of a step.
+            max_steps (int): Maximal number of steps in a shaft section.
+            max_iterations (int): Maximal number of redesigns - at least 1.
+        """
+        if max_iterations < 1:
+            raise ValueError(f'max_iterations must be at least 1, got {max_iterations}')
+
+        self._functions_calculator = functions_calculator
+        self._diameter_series = np.array(sorted(diameter_series), dtype=float)
+        self._length_step = length_step
+        self._min_step_length = min_step_length
+        self._max_steps = max_steps
+        self._max_iterations = max_iterations
+
+    def _snap_diameters(self, diameters):
+        # Round up to the nearest diameter of the series or to whole millimeters above it
+        diameters = np.asarray(diameters, dtype=float)
+        idx = np.searchsorted(self._diameter_series, diameters - 1e-9)
+        return np.where(idx < len(self._diameter_series), self._diameter_series[np.minimum(idx, len(self._diameter_series) - 1)], np.ceil(diameters))
+
+    def _get_segments_max(self, breakpoints, z, d_min):
+        # Maximal minimal diameter on every segment between the subsequent breakpoints
+        values = np.interp(breakpoints, z, d_min)
+        segments_max = np.maximum(values[:-1], values[1:])
+        segments = np.searchsorted(breakpoints, z, side='right') - 1
+        is_within = (segments >= 0) & (segments < len(segments_max))
+        np.maximum.at(segments_max, segments[is_within], d_min[is_within])
+        return segments_max
+
+    def _design_section(self, start, end, d_lower, z, d_min):
+        """
+        Divide the shaft section into steps of minimal volume.
+
+        Args:
+            start (float): Section start coordinate [mm].
+            end (float): Section end coordinate [mm].
+            d_lower (float): Lower limit of the steps diameters [mm].
+            z (np.ndarray): Arguments of the minimal diameter function.
+            d_min (np.ndarray): Minimal diameter function.
+        Returns:
+            (list): list of tuples (start, length, diameter) of the steps from the section start.
+        """
+        if end - start <= 0:
+            return []
+
+        breakpoints = np.unique(np.concatenate([np.arange(start, end, self._length_step), [end]]))
+        segments_max = self._get_segments_max(breakpoints, z, d_min)
+        m = len(segments_max)
+
+        # Diameter and volume of a step between every pair of breakpoints i < j
+        ranges_max = np.full((m + 1, m + 1), np.inf)
+        for i in range(m):
+            ranges_max[i, i + 1:] = np.maximum.accumulate(segments_max[i:])
+        lengths = breakpoints[np.newaxis, :] - breakpoints[:, np.newaxis]
+        is_allowed = (lengths >= min(self._min_step_length, end - start)) & np.isfinite(ranges_max)
+        diameters = self._snap_diameters(np.maximum(np.where(is_allowed, ranges_max, d_lower), d_lower))
+        costs = np.where(is_allowed, lengths * diameters**2, np.inf)
+
+        # Find the cheapest division into at most max_steps steps
+        best_costs = costs[0]
+        best_predecessors = [np.zeros(m + 1, dtype=int)]
+        best_divisions = [best_costs[-1]]
+        for _ in range(self._max_steps - 1):
+            candidates = best_costs[:, np.newaxis] + costs
+            best_predecessors.append(np.argmin(candidates, axis=0))
+            best_costs = np.min(candidates, axis=0)
+            best_divisions.append(best_costs[-1])
+        steps_number = int(np.argmin(best_divisions)) + 1
+
+        steps = []
+        j = m
+        for predecessors in reversed(best_predecessors[:steps_number]):
+            i = predecessors[j]
+            steps.append((breakpoints[i], breakpoints[j] - breakpoints[i], float(diameters[i, j])))
+            j = i
+        steps.reverse()
+
+        # Merge subsequent steps of equal diameter
+        merged_steps = []
+        for step in steps:
+            if merged_steps and merged_steps[-1][2] == step[2]:
+                previous_step = merged_steps.pop()
+                step = (previous_step[0], previous_step[1] + step[1], step[2])
+            merged_steps.append(step)
+
+        return merged_steps
+
+    def _get_eccentrics_widths(self):
+        Li = self._shaft_attributes['Li']
+        widths = list(self._shaft_attributes['Bx'])
+
+        # Only the gap between the first two eccentrics has its own section - the other gaps get closed
+        # by widening every other eccentric from the last but one, so the widened eccentrics reach past
+        # the gaps they close only where the number of the gaps is odd
+        for idx in range(len(Li) - 2, 0, -2):
+            gaps = [Li[idx + 1] - widths[idx + 1] / 2 - Li[idx]]
+            if idx > 1:
+                gaps.append(Li[idx] - Li[idx - 1] - widths[idx - 1] / 2)
+            widths[idx] = max(widths[idx], 2 * max(gaps))
+
+        return widths
+
+    def _design_shaft(self, z, d_min):
+        """
+        Design the shaft sections for the minimal diameter function.
+
+        Args:
+            z (np.ndarray): Arguments of the minimal diameter function.
+            d_min (np.ndarray): Minimal diameter function.
+        Returns:
+            (tuple): Shaft sections in the ShaftCalculator format and the ShaftCalculator they are calculated with.
+        """
+        Li = self._shaft_attributes['Li']
+        L = self._shaft_attributes['L']
+        ds = self._shaft_attributes['ds']
+        de = self._shaft_attributes['de']
+        widths = self._get_eccentrics_widths()
+
+        sections = {'Mimośrody': {}}
+        for idx, position in enumerate(Li):
+            segment_max = self._get_segments_max(np.array([position - widths[idx] / 2, position + widths[idx] / 2]), z, d_min)[0]
+            sections['Mimośrody'][idx] = {'l': widths[idx], 'd': float(self._snap_diameters(max(segment_max, de)))}
+
+        sections_ranges = {'Przed Mimośrodami': (0, Li[0] - widths[0] / 2),
+                           'Za Mimośrodami': (Li[-1] + widths[-1] / 2, L)}
+        if len(Li) >= 2:
+            sections_ranges['Pomiędzy Mimośrodami'] = (Li[0] + widths[0] / 2, Li[1] - widths[1] / 2)
+
+        for section_name, (start, end) in sections_ranges.items():
+            steps = self._design_section(start, end, ds, z, d_min)
+            if section_name == 'Przed Mimośrodami':
+                # Subsections before the eccentrics are numbered from the first eccentric
+                steps.reverse()
+            if steps:
+                sections[section_name] = {idx: {'l': float(length), 'd': diameter} for idx, (_, length, diameter) in enumerate(steps)}
+
+        # Lay the shaft steps out the same way the shaft designer does
+        shaft_calculator = ShaftCalculator()
+        shaft_calculator.set_data(copy.deepcopy(self._shaft_attributes))
+        shaft_calculator.shaft_sections = copy.deepcopy(sections)
+        shaft_calculator.calculate_shaft_sections()
+
+        return sections, shaft_calculator
+
+    def _check_design(self, shaft_steps, z, d_min):
+        for step in shaft_steps:
+            is_within_step = (step['z'] <= z) & (z <= step['z'] + step['l'])
+            if d_min[is_within_step].max(initial=0) > step['d']:
+                return False
+        return True
+
+    def optimize(self, shaft_attributes, density):
+        """
+        Design the shaft.
+
+        Args:
+            shaft_attributes (dict): Shaft initial attributes - see FunctionsCalculator.get_shaft_initial_attributes.
+            density (float): Shaft material density [kg/m^3].
+        Returns:
+            (dict): 'sections' - shaft sections in the ShaftCalculator format,
+                    'shaft_steps' - shaft steps,
+                    'mass' [kg], 'volume' [mm^3] of the shaft,
+                    'meets_conditions' - whether the sections make up the whole shaft and d >= dmin is satisfied along it,
+                    'reason' - why the conditions are not met, None if they are,
+                    'converged' - whether the design stopped changing,
+                    'iterations', 'time' [s] and 'iterations_per_second' of the optimization.
+        """
+        self._shaft_attributes = shaft_attributes
+        start_time = time.perf_counter()
+
+        functions = self._functions_calculator.get_shaft_functions()
+        z = functions['z']
+        d_min_envelope = functions['dmin(z)']['dmin']['function']
+
+        shaft_steps = None
+        reason = None
+        converged = False
+        iterations = 0
+        while iterations < self._max_iterations:
+            iterations += 1
+            sections, shaft_calculator = self._design_shaft(z, d_min_envelope)
+            new_shaft_steps = shaft_calculator.get_shaft_attributes()
+            if new_shaft_steps == shaft_steps:
+                converged = True
+                break
+            shaft_steps = new_shaft_steps
+
+            if not shaft_calculator.is_whole_shaft_designed():
+                # The deflection conditions can be calculated only for the whole shaft
+                reason = f"The designed sections are {sum(step['l'] for step in shaft_steps)} mm long instead of {shaft_attributes['L']} mm"
+                break
+
+            # Recalculate the deflection conditions for the new design
+            self._functions_calculator.calculate_remaining_functions(copy.deepcopy(shaft_steps))
+            functions = self._functions_calculator.get_shaft_functions()
+            d_min = functions['dmin(z)']['dmin']['function']
+            if functions['z'] is not z:
+                # Adaptive sampling - bring the envelope to the new arguments
+                d_min_envelope = np.interp(functions['z'], z, d_min_envelope)
+                z = functions['z']
+            # Keep the envelope of all designs minimal diameters, so the designs can only grow
+            d_min_envelope = np.maximum(d_min_envelope, d_min)
+
+        if reason is None and not self._check_design(shaft_steps, z, d_min):
+            reason = 'The shaft steps diameters are smaller than the minimal diameter'
+
+        elapsed_time = time.perf_counter() - start_time
+        volume = sum(np.pi * step['d']**2 / 4 * step['l'] for step in shaft_steps)
+
+        return {'sections': sections,
+                'shaft_steps': shaft_steps,
+                'volume': volume,
+                'mass': volume * 10**-9 * density,
+                'meets_conditions': reason is None,
+                'reason': reason,
+                'converged': converged,
+                'iterations': iterations,
+                'time': elapsed_time,
+                'iterations_per_second': iterations / elapsed_time}
@@ -1,8 +1,12 @@
+import time
+
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 
 import numpy as np
 
+from .blit_manager import BlitManager
+
 class Chart(FigureCanvas):
     """
     A class representing a chart widget in a PyQt application.
@@ -19,6 +23,10 @@ class Chart(FigureCanvas):
         # Adjust subplot parameters to make the plot fill the figure canvas
         self.figure.subplots_adjust(left=0, right=1, bottom=0, top=1, wspace=0, hspace=0)
 
+        # Redraw the animated items with blitting
+        self.blit_manager = BlitManager(self, self.axes)
+        self.is_draw_pending = False
+
         # Set background color
         self._set_colors()
 
@@ -74,7 +82,7 @@ class Chart(FigureCanvas):
 
         # Add zoom and pan functionality
         zoom_factory(self.axes)
-        pan_factory(self.axes)
+        pan_factory(self.axes, self.blit_manager)
 
     def _draw_axes_lines(self):
         '''
@@ -107,6 +115,17 @@ class Chart(FigureCanvas):
     def get_controls(self):
         return (self.axes, self.figure.canvas)
 
+    def draw_idle(self):
+        # Draw requests of the current event loop turn get coalesced into a single draw
+        self.is_draw_pending = True
+        super().draw_idle()
+
+    def draw(self):
+        self.is_draw_pending = False
+        start_time = time.perf_counter()
+        super().draw()
+        self.blit_manager.frame_timer.record('draw', time.perf_counter() - start_time)
+
 def zoom_factory(axis, base_scale=1.5, min_zoom_range=0.1, max_xlim=(0, 1000), max_ylim=(-500, 500)):
     """
     Returns zooming functionality to axis.
@@ -146,17 +165,25 @@ def zoom_factory(axis, base_scale=1.5, min_zoom_range=0.1, max_xlim=(0, 1000), m
     fig = axis.get_figure()
     fig.canvas.mpl_connect('scroll_event', zoom_fun)
 
-def pan_factory(axis):
+def pan_factory(axis, blit_manager=None):
     """
     Returns panning functionality to axis.
+
+    If the blit manager is given, panning shifts the rendered figure instead of redrawing it.
     """
+    axis._pan_start = None
+
     def on_press(event):
         """Callback for mouse button press."""
         if event.button == 2:  # Middle mouse button
             axis._pan_start = (event.xdata, event.ydata)
+            if blit_manager:
+                blit_manager.start_pan()
 
     def on_release(event):
         """Callback for mouse button release."""
+        if axis._pan_start is not None and blit_manager:
+            blit_manager.end_pan()
         axis._pan_start = None
 
     def on_motion(event):
@@ -170,8 +197,11 @@ def pan_factory(axis):
                 ylim = axis.get_ylim()
                 axis.set_xlim([xlim[0] - dx, xlim[1] - dx])
                 axis.set_ylim([ylim[0] - dy, ylim[1] - dy])
-                
-                axis.figure.canvas.draw_idle()
+
+                if blit_manager:
+                    blit_manager.pan()
+                else:
+                    axis.figure.canvas.draw_idle()
 
     fig = axis.get_figure()
     fig.canvas.mpl_connect('button_press_event', on_press)
@@ -1,6 +1,10 @@
 import mplcursors
+import numpy as np
+
+import instrumentation
 
 from .Chart import Chart
+from .decimation import get_decimation_step, decimate_min_max
 
 class Chart_Plotter():
     def __init__(self, chart: Chart):
@@ -10,21 +14,90 @@ class Chart_Plotter():
         self._active_plots = {}     # Keeps track of active plots
         self._selected_plots = []   # Keeps track of selected plots
 
+        self._z = np.array([])
+        self._decimation_step = 1   # Number of points merged into one bucket at the current zoom level
+        self._decimated_plots = {}  # Keeps decimated plots data per zoom level
+
         self._get_chart_controls()
 
     def _get_chart_controls(self):
         self._ax, self._canvas = self._chart.get_controls()
+        self._blit_manager = self._chart.blit_manager
         self._cursor = mplcursors.cursor(self._ax, hover=False)
+        self._cursor_lines = None   # Plot lines tracked by the cursor
+
+        # Decimate the plots again when zooming or panning changes the visible range
+        self._ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def _get_decimation_step(self):
+        return get_decimation_step(self._z, self._ax.get_xlim(), self._ax.bbox.width)
+
+    def _get_plot_data(self, plot_name):
+        """
+        Get the plot data decimated for the current zoom level.
+
+        Returns:
+            (tuple): Decimated arguments and values of the plot.
+        """
+        key = (plot_name, self._decimation_step)
+        if key not in self._decimated_plots:
+            y = self._plots[plot_name]['function'] * self._plots[plot_name]['multiplier']
+            if plot_name.lower().startswith('d'):
+                y = y / 2
+            self._decimated_plots[key] = decimate_min_max(self._z, y, self._decimation_step)
+        return self._decimated_plots[key]
+
+    def _on_xlim_changed(self, ax):
+        """
+        Update the active plots with the data decimated for the new zoom level.
+        Panning keeps the zoom level, so it does not change the plots.
+        """
+        decimation_step = self._get_decimation_step()
+        if decimation_step == self._decimation_step:
+            return
+        self._decimation_step = decimation_step
+
+        for plot_name in self._active_plots:
+            self._update_plot(plot_name)
+
+    def _update_plot(self, plot_name):
+        """
+        Update the data of the active plot elements in place.
+        """
+        z, y = self._get_plot_data(plot_name)
+        if plot_name.lower().startswith('d'):
+            above, below = self._active_plots[plot_name]
+            above.set_data(z, y)
+            below.set_data(z, -y)
+        else:
+            plot, filling = self._active_plots[plot_name]
+            plot.set_data(z, y)
+            filling.set_verts([get_filling_vertices(z, y)])
+
+    def _remove_plot(self, plot_name):
+        for element in self._active_plots[plot_name]:
+            self._blit_manager.remove_artist(element)
+            element.remove()
+        del self._active_plots[plot_name]
 
     def _reset_plots(self):
-        # Remove any active plots so they can be properly redrawn
+        """
+        Update the active plots with the new functions - the plots which functions are gone get removed.
+        """
+        # Remove annotations of the outdated values
+        if self._cursor:
+            for selection in list(self._cursor.selections):
+                self._cursor.remove_selection(selection)
+
         for plot_name in list(self._active_plots.keys()):
-            for line in self._active_plots[plot_name]:
-                line.remove()
-            del self._active_plots[plot_name]
+            if plot_name in self._plots:
+                self._update_plot(plot_name)
+            else:
+                self._remove_plot(plot_name)
 
         self._refresh_selected_plots()
 
+    @instrumentation.timed('chart.refresh_selected_plots')
     def _refresh_selected_plots(self):
         """
         Switch the current plots based on the selected plots.
@@ -32,47 +105,52 @@ class Chart_Plotter():
         # Remove plots that are not selected
         for plot_name in list(self._active_plots.keys()):
             if plot_name not in self._selected_plots:
-                for element in self._active_plots[plot_name]:
-                    element.remove()
-                del self._active_plots[plot_name]
+                self._remove_plot(plot_name)
     
         # Add new selected plots
         for plot_name in self._selected_plots:
             if plot_name not in self._active_plots:
-                y = self._plots[plot_name]['function'] * self._plots[plot_name]['multiplier']
+                z, y = self._get_plot_data(plot_name)
                 color = self._plots[plot_name]['color']
                 if  plot_name.lower().startswith('d'):
-                    d_half_above_axis = y / 2
-                    d_half_below_axis = [-d for d in d_half_above_axis]
-
-                    above, = self._ax.plot(self._z, d_half_above_axis, linewidth = 1, color=color, zorder=self._chart.plots_layer)
-                    below, = self._ax.plot(self._z, d_half_below_axis, linewidth = 1, color=color, zorder=self._chart.plots_layer)
+                    above, = self._ax.plot(z, y, linewidth = 1, color=color, zorder=self._chart.plots_layer)
+                    below, = self._ax.plot(z, -y, linewidth = 1, color=color, zorder=self._chart.plots_layer)
                     plot_elements = [above, below]
                 else:
-                    plot, = self._ax.plot(self._z, y, linewidth = 1, color=color, zorder=self._chart.plots_layer)
-                    filling = self._ax.fill_between(self._z, y, alpha=0.3, color=color, zorder=self._chart.plots_layer)
+                    plot, = self._ax.plot(z, y, linewidth = 1, color=color, zorder=self._chart.plots_layer)
+                    filling = self._ax.fill_between(z, y, alpha=0.3, color=color, zorder=self._chart.plots_layer)
                     plot_elements = [plot, filling]
+                for element in plot_elements:
+                    self._blit_manager.add_artist(element)
                 self._active_plots[plot_name] = plot_elements
         
         self._refresh_cursor()
 
-        self._canvas.draw()
+        self._blit_manager.update()
 
     def _refresh_cursor(self):
         """
         Refresh the mplcursors cursor for interactive data display.
         """
+        # Collect all current plot lines
+        current_lines = [line for lines in self._active_plots.values() for line in lines if hasattr(line, 'get_xdata')]
+
+        # Keep the cursor if the plot lines did not get replaced
+        if current_lines == self._cursor_lines:
+            return
+        self._cursor_lines = current_lines
+
         # Remove the previous cursor if it exists
         if hasattr(self, '_cursor') and self._cursor:
             self._cursor.remove()
 
-        # Collect all current plot lines
-        current_lines = [line for lines in self._active_plots.values() for line in lines if hasattr(line, 'get_xdata')]
-
         # Create a new cursor if there are plots
         if current_lines:
             self._cursor = mplcursors.cursor(current_lines, hover=False)
             self._cursor.connect("add", lambda sel: self._annotate_cursor(sel))
+            # Keep the annotations over the blitted plots
+            self._cursor.connect("add", lambda sel: self._blit_manager.add_artist(sel.annotation))
+            self._cursor.connect("remove", lambda sel: self._blit_manager.remove_artist(sel.annotation))
         else:
             self._cursor = None  # Reset cursor if there are no plots
 
@@ -137,9 +215,18 @@ class Chart_Plotter():
         :param functions: Dictionary containing the functions arrays for the plots.
         """
         self._z = arguments
+        self._decimation_step = self._get_decimation_step()
+        self._decimated_plots = {}
 
         self._plots = {}
         for id, function in functions.items():
             self._plots[id] = function
 
         self._reset_plots()
+
+def get_filling_vertices(x, y):
+    """
+    Get the vertices of the polygon filling the area between the curve and the x axis,
+    the way fill_between builds it.
+    """
+    return np.concatenate(([[x[0], 0]], np.column_stack((x, y)), [[x[-1], 0]], np.column_stack((x[::-1], np.zeros(len(x))))))
@@ -0,0 +1,207 @@
+import time
+from collections import deque
+
+import numpy as np
+from PyQt6.QtCore import QTimer
+
+import instrumentation
+
+class FrameTimer:
+    """
+    Keep track of the durations of the recent chart frames.
+    """
+    def __init__(self, size=120):
+        self._frames = deque(maxlen=size)   # (kind, duration [s]) of the recent frames
+
+    def record(self, kind, duration):
+        """
+        Record the frame.
+
+        Args:
+            kind (str): 'draw' for a full redraw of the figure, 'blit' for a redraw of the animated artists
+                        and 'pan' for a shift of the rendered figure.
+            duration (float): Duration of the frame [s].
+        """
+        self._frames.append((kind, duration))
+        if instrumentation.is_enabled():
+            instrumentation.add_timing(f'chart.frame.{kind}', duration)
+
+    def get_report(self):
+        """
+        Get the statistics of the recent frames.
+
+        Returns:
+            (dict): number of the 'frames' and frames of every kind, 'mean' and 'max' frame time [ms]
+                    and 'fps' the mean frame time allows for.
+        """
+        durations = [duration for _, duration in self._frames]
+        if not durations:
+            return {'frames': 0, 'mean': None, 'max': None, 'fps': None}
+
+        report = {'frames': len(durations)}
+        for kind, _ in self._frames:
+            report[kind] = report.get(kind, 0) + 1
+
+        mean_duration = sum(durations) / len(durations)
+        report['mean'] = round(mean_duration * 1000, 2)
+        report['max'] = round(max(durations) * 1000, 2)
+        report['fps'] = round(1 / mean_duration, 1) if mean_duration else None
+        return report
+
+    def clear(self):
+        self._frames.clear()
+
+class BlitManager:
+    """
+    Redraw the chart with blitting.
+
+    The static artists (axes lines, shaft) get rendered only on the full redraw of the figure,
+    which caches them as the background. The animated artists (function plots, cursor annotations) get
+    drawn over the cached background, so changing them does not re-render the whole figure.
+    The overlay artists (markers, dimensions) lie above the function plots, but change only with the full
+    redraw - they get rendered alone once per full redraw and their pixels get composited over
+    the animated artists of lower zorder.
+    Panning shifts the rendered figure instead of re-rendering it, until the view settles.
+    """
+    def __init__(self, canvas, axes, settle_time=150):
+        """
+        Args:
+            canvas (FigureCanvas): Canvas of the chart.
+            axes (Axes): Axes of the chart.
+            settle_time (int): Time [ms] after the last pan movement the figure gets fully redrawn.
+        """
+        self._canvas = canvas
+        self._ax = axes
+
+        self._artists = []          # Animated artists
+        self._overlay_artists = []  # Artists composited over the animated artists of lower zorder
+        self._background = None     # Figure rendered without the animated and overlay artists
+        self._overlay = None        # Rendered overlay - its pixels indices, their color multiplied by alpha, 1 - alpha and its lowest zorder
+        self._pan_snapshot = None   # Figure rendered at the start of the pan and its axes limits
+
+        self.frame_timer = FrameTimer()
+
+        self._settle_timer = QTimer()
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(settle_time)
+        self._settle_timer.timeout.connect(self._canvas.draw_idle)
+
+        self._canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add_artist(self, artist):
+        """
+        Add the artist to be drawn over the cached background.
+        """
+        artist.set_animated(True)
+        self._artists.append(artist)
+
+    def add_overlay_artist(self, artist):
+        """
+        Add the artist to be composited over the animated artists of lower zorder - the artist
+        has to change only with the full redraw of the figure.
+        """
+        artist.set_animated(True)
+        self._overlay_artists.append(artist)
+
+    def remove_artist(self, artist):
+        for artists in [self._artists, self._overlay_artists]:
+            if artist in artists:
+                artists.remove(artist)
+
+    def _render_overlay(self):
+        # Render the overlay artists alone over the transparent figure and keep their pixels
+        self._overlay = None
+        artists = sorted((artist for artist in self._overlay_artists if artist.figure is not None and artist.get_visible()), key=lambda artist: artist.get_zorder())
+        if not artists:
+            return
+
+        self._canvas.get_renderer().clear()
+        for artist in artists:
+            self._canvas.figure.draw_artist(artist)
+
+        pixels = np.asarray(self._canvas.buffer_rgba()).reshape(-1, 4)
+        indices = np.flatnonzero(pixels[:, 3])
+        alpha = pixels[indices, 3:] / 255
+        self._overlay = (indices, pixels[indices, :3] * alpha, 1 - alpha, artists[0].get_zorder())
+
+        self._canvas.restore_region(self._background[0])
+
+    def _draw_overlay(self):
+        indices, color, transparency, _ = self._overlay
+        pixels = np.asarray(self._canvas.buffer_rgba()).reshape(-1, 4)
+        pixels[indices, :3] = color + pixels[indices, :3] * transparency + 0.5
+
+    def _draw_animated(self):
+        is_overlay_drawn = self._overlay is None
+        for artist in sorted(self._artists, key=lambda artist: artist.get_zorder()):
+            if not is_overlay_drawn and artist.get_zorder() > self._overlay[3]:
+                self._draw_overlay()
+                is_overlay_drawn = True
+            if artist.figure is not None:
+                self._canvas.figure.draw_artist(artist)
+
+        if not is_overlay_drawn:
+            self._draw_overlay()
+
+    def _on_draw(self, event):
+        """
+        Cache the background and the overlay once the figure gets fully redrawn and draw the animated artists over it.
+        """
+        self._background = (self._canvas.copy_from_bbox(self._canvas.figure.bbox), self._canvas.figure.bbox.bounds)
+        self._render_overlay()
+        self._draw_animated()
+
+        if self._pan_snapshot is not None:
+            self._take_pan_snapshot()
+
+    def update(self):
+        """
+        Redraw the animated artists over the cached background.
+        """
+        # The full redraw draws the animated artists too
+        if self._background is None or self._background[1] != self._canvas.figure.bbox.bounds or getattr(self._canvas, 'is_draw_pending', False):
+            self._canvas.draw_idle()
+            return
+
+        start_time = time.perf_counter()
+        self._canvas.restore_region(self._background[0])
+        self._draw_animated()
+        self._canvas.blit(self._canvas.figure.bbox)
+        self.frame_timer.record('blit', time.perf_counter() - start_time)
+
+    def _take_pan_snapshot(self):
+        self._pan_snapshot = (self._canvas.copy_from_bbox(self._ax.bbox), self._ax.get_xlim(), self._ax.get_ylim())
+
+    def start_pan(self):
+        self._take_pan_snapshot()
+
+    def pan(self):
+        """
+        Shift the figure rendered at the start of the pan to the current axes limits
+        and schedule the full redraw once the view settles.
+        """
+        if self._pan_snapshot is None:
+            self._canvas.draw_idle()
+            return
+
+        start_time = time.perf_counter()
+        region, (x_start, x_end), (y_start, y_end) = self._pan_snapshot
+        xlim, ylim = self._ax.get_xlim(), self._ax.get_ylim()
+
+        # Shift of the view [px]
+        dx = (x_start - xlim[0]) / (xlim[1] - xlim[0]) * self._ax.bbox.width
+        dy = (y_start - ylim[0]) / (ylim[1] - ylim[0]) * self._ax.bbox.height
+
+        # Clear the axes and restore the shifted figure - the uncovered area stays blank until the full redraw
+        self._ax.draw_artist(self._ax.patch)
+        x1, y1, x2, y2 = region.get_extents()
+        self._canvas.restore_region(region, bbox=(x1, y1, x2, y2), xy=(x1 + dx, y1 - dy))
+        self._canvas.blit(self._ax.bbox)
+        self.frame_timer.record('pan', time.perf_counter() - start_time)
+
+        self._settle_timer.start()
+
+    def end_pan(self):
+        self._settle_timer.stop()
+        self._pan_snapshot = None
+        self._canvas.draw_idle()
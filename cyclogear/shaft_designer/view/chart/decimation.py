@@ -0,0 +1,48 @@
+import numpy as np
+
+def get_decimation_step(x, xlim, width):
+    """
+    Get the number of points merged into a single bucket so the visible part of the curve
+    has about two points per pixel.
+
+    The step is rounded down to a power of 2, so all the views of similar zoom level share it.
+
+    Args:
+        x (np.ndarray): Sorted arguments of the curve.
+        xlim (tuple): (min, max) of the visible x range.
+        width (float): Width of the axes [px].
+    Returns:
+        (int): Number of points per bucket - 1 if the curve does not need decimation.
+    """
+    first, last = np.searchsorted(x, xlim)
+    visible_points = last - first
+    if width <= 0 or visible_points <= 2 * width:
+        return 1
+    return 1 << int(np.log2(visible_points / width))
+
+def decimate_min_max(x, y, step):
+    """
+    Downsample the curve keeping the minimum and maximum of every bucket of points,
+    so the peaks of the curve stay visible.
+
+    Args:
+        x (np.ndarray): Arguments of the curve.
+        y (np.ndarray): Values of the curve.
+        step (int): Number of points per bucket.
+    Returns:
+        (tuple): Decimated x and y arrays.
+    """
+    if step <= 2 or len(x) <= 2 * step:
+        return x, y
+
+    buckets_number = len(y) // step
+    buckets = y[:buckets_number * step].reshape(buckets_number, step)
+    offsets = np.arange(buckets_number) * step
+
+    min_indices = buckets.argmin(axis=1) + offsets
+    max_indices = buckets.argmax(axis=1) + offsets
+
+    # Keep the extremes of the buckets, the points left over the last bucket and the end points - sorted in their original order
+    indices = np.unique(np.concatenate((min_indices, max_indices, np.arange(buckets_number * step, len(y)), [0, len(y) - 1])))
+
+    return x[indices], y[indices]
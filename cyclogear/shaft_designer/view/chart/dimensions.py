@@ -0,0 +1,164 @@
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.transforms import IdentityTransform
+
+def get_marker_path(marker):
+    marker_style = MarkerStyle(marker)
+    return marker_style.get_path().transformed(marker_style.get_transform())
+
+# Arrowheads pointing in the direction (dz, dy) - open carets with the tip at the dimension line end
+ARROWHEADS = {direction: get_marker_path(marker) for direction, marker in [((-1, 0), 4), ((1, 0), 5), ((0, 1), 6), ((0, -1), 7)]}
+
+ARROWHEAD_SIZE = 28     # Arrowhead size [pt^2] - about the size of annotate '<->' arrowheads
+POINT_SIZE = 8          # Eccentric middle point size [pt^2]
+
+def get_direction(start, end):
+    """
+    Get the direction of the line end, rounded to one of the arrowheads directions.
+
+    Args:
+        start (tuple): (z, y) of the line start.
+        end (tuple): (z, y) of the line end.
+    Returns:
+        (tuple): Direction (dz, dy) of the end.
+    """
+    dz, dy = end[0] - start[0], end[1] - start[1]
+    if abs(dz) >= abs(dy):
+        return (1 if dz >= 0 else -1, 0)
+    return (0, 1 if dy > 0 else -1)
+
+class DimensionsPlot:
+    """
+    Plot of a group of dimensions drawn with collections.
+
+    All the dimension lines of the group make up a single LineCollection, the reference lines another one
+    and the arrowheads and points a PathCollection each, so redrawing the dimensions updates the geometry
+    of the collections instead of re-creating the artists. Only the labels are separate Text artists,
+    which get reused too.
+    """
+    def __init__(self, chart):
+        self._chart = chart
+        self._ax = chart.axes
+
+        self._lines = None              # Dimension lines collection
+        self._reference_lines = None    # Reference lines collection
+        self._arrowheads = None         # Arrowheads collection
+        self._points = None             # Eccentric middle points collection
+        self._labels = []               # Dimension labels
+
+        self.is_drawn = False
+
+        self.clear()
+
+    def _init_artists(self):
+        color = self._chart.dimensions_color
+
+        self._lines = LineCollection([], linewidths=1, colors=color, zorder=self._chart.dimensions_layer)
+        self._reference_lines = LineCollection([], linewidths=0.5, colors=color, zorder=self._chart.reference_lines_layer)
+        self._arrowheads = PathCollection([], sizes=[ARROWHEAD_SIZE], offset_transform=self._ax.transData, transform=IdentityTransform(),
+                                          facecolors='none', edgecolors=color, linewidths=1, zorder=self._chart.dimensions_layer)
+        self._points = PathCollection([get_marker_path('o')], sizes=[POINT_SIZE], offset_transform=self._ax.transData, transform=IdentityTransform(),
+                                      facecolors=color, edgecolors=color, zorder=self._chart.dimensions_layer)
+
+        for collection in [self._reference_lines, self._lines, self._arrowheads, self._points]:
+            self._ax.add_collection(collection, autolim=False)
+
+        # Dimensions lie above the function plots - the reference lines lie below them
+        for collection in [self._lines, self._arrowheads, self._points]:
+            self._chart.blit_manager.add_overlay_artist(collection)
+
+    def clear(self):
+        """
+        Clear the dimensions geometry - call before adding the dimensions to be drawn.
+        """
+        self._segments = []
+        self._reference_segments = []
+        self._arrowhead_offsets = []
+        self._arrowhead_paths = []
+        self._point_offsets = []
+        self._label_properties = []
+
+    def _add_line(self, start, end):
+        self._segments.append([start, end])
+        for tip, tail in [(start, end), (end, start)]:
+            self._arrowhead_offsets.append(tip)
+            self._arrowhead_paths.append(ARROWHEADS[get_direction(tail, tip)])
+
+    def add_horizontal_dimension(self, text, start_z, end_z, label_z_position, y_position, item_y_position=0):
+        # Add dimension line
+        self._add_line((start_z, y_position), (end_z, y_position))
+
+        # Add reference lines
+        for position in [start_z, end_z]:
+            self._reference_segments.append([(position, item_y_position), (position, y_position)])
+
+        # Add dimension label
+        label_offset = 0.3
+        self._label_properties.append({'x': label_z_position, 'y': y_position + label_offset, 'text': text,
+                                       'rotation': 0, 'ha': 'center', 'va': 'bottom'})
+
+    def add_vertical_dimension(self, text, z_position, start_y, end_y, label_y_position, item_z_position=-1):
+        # Add dimension line
+        self._add_line((z_position, start_y), (z_position, end_y))
+
+        # if it is eccentric dimension, add point marking the middle (y) of the section
+        if end_y == 0:
+            self._point_offsets.append((z_position, start_y))
+
+        # Add reference lines
+        if item_z_position >= 0:
+            for position in [start_y, end_y]:
+                self._reference_segments.append([(item_z_position, position), (z_position, position)])
+
+        # Add dimension label
+        offset = 0.3
+        self._label_properties.append({'x': z_position - offset, 'y': label_y_position, 'text': text,
+                                       'rotation': 90, 'ha': 'right', 'va': 'center'})
+
+    def draw(self):
+        """
+        Update the artists with the added dimensions.
+        """
+        if self._lines is None:
+            self._init_artists()
+
+        self._lines.set_segments(self._segments)
+        self._reference_lines.set_segments(self._reference_segments)
+        self._arrowheads.set_offsets(np.reshape(self._arrowhead_offsets, (-1, 2)))
+        self._arrowheads.set_paths(self._arrowhead_paths)
+        self._points.set_offsets(np.reshape(self._point_offsets, (-1, 2)))
+
+        # Reuse the labels - add the missing ones and hide the redundant ones
+        while len(self._labels) < len(self._label_properties):
+            label = self._ax.text(0, 0, '',
+                                  fontsize=8,
+                                  color=self._chart.dimensions_color,
+                                  zorder=self._chart.dimensions_layer,
+                                  bbox=dict(alpha=0, zorder=self._chart.dimensions_layer)
+                                  )
+            self._chart.blit_manager.add_overlay_artist(label)
+            self._labels.append(label)
+
+        for idx, label in enumerate(self._labels):
+            if idx < len(self._label_properties):
+                label.update(self._label_properties[idx])
+                label.set_visible(True)
+            else:
+                label.set_visible(False)
+
+        for collection in [self._reference_lines, self._lines, self._arrowheads, self._points]:
+            collection.set_visible(True)
+
+        self.is_drawn = True
+
+    def remove(self):
+        """
+        Hide the dimensions - the artists are kept to be reused.
+        """
+        self.clear()
+        if self._lines is not None:
+            for artist in [self._reference_lines, self._lines, self._arrowheads, self._points, *self._labels]:
+                artist.set_visible(False)
+
+        self.is_drawn = False
@@ -0,0 +1,184 @@
+"""
+Measure the application cold start and check it against the time budgets.
+
+Usage:
+    python cyclogear/startup_benchmark.py [-o OUTPUT] [-n RUNS] [--budget METRIC=MS ...]
+
+Every run starts the application in a fresh interpreter with the offscreen Qt platform and
+answers the startup dialog with a new project. The medians of the runs are written as a JSON
+report - the exit code is non-zero if any of the budgets is exceeded or any of the heavy modules
+gets imported before the startup dialog shows up.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules which import times are measured - each one in a fresh interpreter
+IMPORT_MODULES = ['PyQt6.QtWidgets', 'matplotlib', 'mplcursors', 'pandas']
+
+# Modules that must not be imported before the startup dialog shows up
+HEAVY_MODULES = ['matplotlib', 'mplcursors', 'pandas']
+
+# Time budgets [ms] of the startup marks measured from the start of main.py
+DEFAULT_BUDGETS = {
+    'window_shown': 750,
+    'startup_dialog': 1000,
+    'usable': 1500,
+}
+
+def measure_import(module):
+    """
+    Import the module - runs in the child interpreter.
+
+    Returns:
+        (float): Import time [ms] or None if the module is not installed.
+    """
+    start_time = time.perf_counter()
+    try:
+        __import__(module)
+    except ImportError:
+        return None
+    return (time.perf_counter() - start_time) * 1000
+
+def measure_startup():
+    """
+    Start the application and answer the startup dialog with a new project - runs in the child interpreter.
+
+    Returns:
+        (dict): 'window_shown', 'startup_dialog' and 'usable' times [ms], startup phases of the
+                StartupTimer report and heavy modules imported before the startup dialog.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    import main
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from main_interface.view.MainWindow import MainWindow
+    from main_interface.view.StartupDialog import StartupDialog
+
+    marks = {}
+    heavy_modules = []
+
+    def mark(name):
+        marks.setdefault(name, (time.perf_counter() - main.startup_start_time) * 1000)
+
+    show = MainWindow.show
+    def show_window(window):
+        show(window)
+        mark('window_shown')
+
+    def exec_startup_dialog(dialog):
+        mark('startup_dialog')
+        heavy_modules.extend(module for module in HEAVY_MODULES if module in sys.modules)
+        # Leave the event loop once the startup gets finished
+        QTimer.singleShot(0, lambda: QApplication.instance().exit(0))
+        return StartupDialog.DialogCode.Accepted
+
+    MainWindow.show = show_window
+    StartupDialog.exec = exec_startup_dialog
+
+    try:
+        main.main()
+    except SystemExit:
+        pass
+
+    report = main.startup_timer.get_report()
+    marks['usable'] = report['total']
+
+    return {'marks': marks, 'phases': report['phases'], 'heavy_modules': heavy_modules}
+
+def run_child(*args):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), *args], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def get_median(values):
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values), 2) if values else None
+
+def run_benchmark(runs, budgets):
+    """
+    Run the benchmark.
+
+    Args:
+        runs (int): Number of runs - medians of them get reported.
+        budgets (dict): Time budgets [ms] of the startup marks.
+    Returns:
+        (dict): Benchmark report.
+    """
+    imports = {module: get_median([run_child('--child-import', module) for _ in range(runs)]) for module in IMPORT_MODULES}
+
+    startups = [run_child('--child-startup') for _ in range(runs)]
+    marks = {name: get_median([startup['marks'].get(name) for startup in startups]) for name in startups[0]['marks']}
+    phases = {name: get_median([startup['phases'].get(name) for startup in startups]) for name in startups[0]['phases']}
+    heavy_modules = sorted({module for startup in startups for module in startup['heavy_modules']})
+
+    exceeded = {name: {'time': marks.get(name), 'budget': budget} for name, budget in budgets.items()
+                if marks.get(name) is None or marks[name] > budget}
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': runs,
+        'imports': imports,
+        'startup': marks,
+        'phases': phases,
+        'heavy_modules': heavy_modules,
+        'budgets': budgets,
+        'exceeded': exceeded,
+        'passed': not exceeded and not heavy_modules,
+    }
+
+def parse_budget(value):
+    name, _, budget = value.partition('=')
+    if name not in DEFAULT_BUDGETS:
+        raise argparse.ArgumentTypeError(f"unknown metric '{name}' - use one of: {', '.join(DEFAULT_BUDGETS)}")
+    try:
+        return name, float(budget)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid budget '{budget}'")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cyclogear-startup-benchmark', description='Measure the CycloGear cold start and check it against the time budgets.')
+    parser.add_argument('-o', '--output', help='output JSON report file - standard output by default')
+    parser.add_argument('-n', '--runs', type=int, default=3, help='number of runs - medians of them get reported')
+    parser.add_argument('--budget', type=parse_budget, action='append', default=[], metavar='METRIC=MS',
+                        help=f"override time budget of a metric ({', '.join(DEFAULT_BUDGETS)})")
+    parser.add_argument('--child-import', help=argparse.SUPPRESS)
+    parser.add_argument('--child-startup', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child_import:
+        print(json.dumps(measure_import(args.child_import)))
+        return 0
+    if args.child_startup:
+        print(json.dumps(measure_startup()))
+        return 0
+
+    budgets = {**DEFAULT_BUDGETS, **dict(args.budget)}
+    report = run_benchmark(max(args.runs, 1), budgets)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+    for name, result in report['exceeded'].items():
+        sys.stderr.write(f"Budget exceeded: {name} took {result['time']} ms, budget is {result['budget']} ms\n")
+    if report['heavy_modules']:
+        sys.stderr.write(f"Imported before the startup dialog: {', '.join(report['heavy_modules'])}\n")
+
+    return 0 if report['passed'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+# The app modules import each other from the cyclogear directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cyclogear'))
+
+from benchmark import ECCENTRICS_NUMBERS, SHAFT_STEPS_NUMBERS, get_calculated_functions_calculator, make_mechanism_data, make_shaft_steps
+
+@pytest.fixture(params=ECCENTRICS_NUMBERS, ids='n={}'.format)
+def eccentrics_number(request):
+    return request.param
+
+@pytest.fixture(params=SHAFT_STEPS_NUMBERS, ids='steps={}'.format)
+def steps_number(request):
+    return request.param
+
+@pytest.fixture
+def shaft_length():
+    # Override with parametrize to test the longer shafts
+    return 300
+
+@pytest.fixture
+def mechanism_data(eccentrics_number, shaft_length):
+    # Input mechanism data - see benchmark.make_mechanism_data
+    return make_mechanism_data(eccentrics_number, shaft_length)
+
+@pytest.fixture
+def shaft_attributes(mechanism_data):
+    # Shaft initial attributes the shaft steps get designed for
+    return get_calculated_functions_calculator(mechanism_data).get_shaft_initial_attributes()
+
+@pytest.fixture
+def shaft_design(shaft_attributes, steps_number):
+    # Shaft sections and shaft steps - see benchmark.make_shaft_steps
+    return make_shaft_steps(shaft_attributes, steps_number)
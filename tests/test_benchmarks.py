@@ -0,0 +1,109 @@
+"""
+Benchmarks of the calculation hot paths - the pytest-benchmark counterpart of benchmark.py.
+
+Save a baseline and compare the later runs with it - the run fails if the minimum time
+of any of the benchmarks got longer than the baseline one by more than 25%:
+    pytest tests/test_benchmarks.py --benchmark-save=baseline
+    pytest tests/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=min:25%
+"""
+import copy
+import os
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from input_mechanism.utils.dict_utils import extract_data, fetch_data_subset
+
+from shaft_designer.model.functions_calculator import FunctionsCalculator
+
+from benchmark import DB_QUERIES, LONG_SHAFT_LENGTH, get_data_paths, get_shaft_calculator, make_bearings_attributes
+from config import DATA_DIR_NAME, dependencies_path
+
+@pytest.mark.benchmark(group='functions.initial')
+def test_initial_functions(benchmark, mechanism_data):
+    benchmark(lambda: FunctionsCalculator().calculate_initial_functions_and_attributes(mechanism_data))
+
+@pytest.mark.benchmark(group='functions.remaining')
+def test_remaining_functions(benchmark, mechanism_data, shaft_design):
+    _, shaft_steps = shaft_design
+    functions_calculator = FunctionsCalculator()
+    functions_calculator.calculate_initial_functions_and_attributes(copy.deepcopy(mechanism_data))
+    benchmark(functions_calculator.calculate_remaining_functions, shaft_steps)
+
+# Adaptive sampling against the uniform one on a long shaft - the uniform one calculates the functions every 0.1 mm
+@pytest.mark.benchmark(group='functions.initial.long_shaft')
+@pytest.mark.parametrize('eccentrics_number', [2])
+@pytest.mark.parametrize('shaft_length', [LONG_SHAFT_LENGTH])
+@pytest.mark.parametrize('sampling', ['uniform', 'adaptive'])
+def test_initial_functions_sampling(benchmark, mechanism_data, sampling):
+    benchmark(lambda: FunctionsCalculator(sampling).calculate_initial_functions_and_attributes(mechanism_data))
+
+@pytest.mark.benchmark(group='functions.remaining.long_shaft')
+@pytest.mark.parametrize('eccentrics_number', [2])
+@pytest.mark.parametrize('shaft_length', [LONG_SHAFT_LENGTH])
+@pytest.mark.parametrize('steps_number', [8])
+@pytest.mark.parametrize('sampling', ['uniform', 'adaptive'])
+def test_remaining_functions_sampling(benchmark, mechanism_data, shaft_design, sampling):
+    _, shaft_steps = shaft_design
+    functions_calculator = FunctionsCalculator(sampling)
+    functions_calculator.calculate_initial_functions_and_attributes(copy.deepcopy(mechanism_data))
+    benchmark(functions_calculator.calculate_remaining_functions, shaft_steps)
+
+# Shaft drawing - editing one subsection of a fully designed shaft
+@pytest.fixture
+def shaft_calculator(shaft_attributes, shaft_design):
+    sections, _ = shaft_design
+    return get_shaft_calculator(shaft_attributes, sections)
+
+@pytest.mark.benchmark(group='shaft')
+@pytest.mark.parametrize('eccentrics_number', [2])
+@pytest.mark.parametrize('steps_number', [8])
+def test_calculate_shaft_sections(benchmark, shaft_calculator, shaft_design):
+    sections, _ = shaft_design
+    benchmark(shaft_calculator.calculate_shaft_sections, ('Za Mimośrodami', 0, dict(sections['Za Mimośrodami'][0]), None))
+
+@pytest.mark.benchmark(group='shaft')
+@pytest.mark.parametrize('eccentrics_number', [2])
+@pytest.mark.parametrize('steps_number', [8])
+def test_calculate_limits(benchmark, shaft_calculator, shaft_design):
+    sections, _ = shaft_design
+    current_subsections = {section_name: list(section) for section_name, section in sections.items() if section_name != 'Mimośrody'}
+    benchmark(shaft_calculator.calculate_limits, current_subsections)
+
+@pytest.mark.benchmark(group='shaft')
+@pytest.mark.parametrize('eccentrics_number', [2])
+@pytest.mark.parametrize('steps_number', [8])
+def test_calculate_bearings(benchmark, shaft_calculator, shaft_attributes):
+    bearings_attributes = make_bearings_attributes(shaft_attributes)
+    benchmark(lambda: shaft_calculator.calculate_bearings(copy.copy(bearings_attributes)))
+
+# Exchange of the data between the tabs and the component
+@pytest.mark.benchmark(group='dict_utils')
+@pytest.mark.parametrize('eccentrics_number', [2])
+def test_extract_data(benchmark, mechanism_data):
+    paths = get_data_paths(mechanism_data)
+    benchmark(extract_data, mechanism_data, paths)
+
+@pytest.mark.benchmark(group='dict_utils')
+@pytest.mark.parametrize('eccentrics_number', [2])
+def test_fetch_data_subset(benchmark, mechanism_data):
+    subset = extract_data(mechanism_data, get_data_paths(mechanism_data))
+    target = copy.deepcopy(mechanism_data)
+    benchmark(fetch_data_subset, target, subset)
+
+# The database gets built with db_creator.py
+@pytest.mark.benchmark(group='db')
+@pytest.mark.skipif(not os.path.exists(dependencies_path(f'{DATA_DIR_NAME}//components.db')), reason='the components database does not exist')
+@pytest.mark.parametrize('cached', [False, True], ids=['query', 'cached'])
+@pytest.mark.parametrize('query', list(DB_QUERIES.values()), ids=list(DB_QUERIES))
+def test_db_queries(benchmark, query, cached):
+    from db_handler.model.db_handler import DbHandler
+
+    db_handler = DbHandler()
+    def run_query():
+        # Measure the query itself, not the results cache
+        if not cached:
+            db_handler.clear_cache()
+        query(db_handler)
+    benchmark(run_query)
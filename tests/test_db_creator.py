@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from db_handler.model.queries import BEARINGS_QUERY, BEARING_TYPES_QUERY, ROLLING_ELEMENTS_QUERY, NEAREST_ROLLING_ELEMENTS_QUERY
+
+DB_CREATOR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cyclogear', 'db_handler', 'model', 'db_creator.py')
+
+QUERIES = {
+    'bearings': (BEARINGS_QUERY.format('e,'), ('walcowe', 'centralne')),
+    'bearings_constrained': (BEARINGS_QUERY.format('') + ' AND d_in >= ? AND c >= ? ORDER BY d_in, c_0 LIMIT 5', ('kulkowe', 'podporowe', 20, 10)),
+    'bearing_types': (BEARING_TYPES_QUERY, ('podporowe',)),
+    'rolling_elements': (ROLLING_ELEMENTS_QUERY, ('kulkowe',)),
+    'rolling_elements_nearest': (NEAREST_ROLLING_ELEMENTS_QUERY, ('kulkowe', 5.5)),
+}
+
+@pytest.fixture(scope='module')
+def database_path(tmp_path_factory):
+    # Catalogue built by db_creator.py from the csv files of the data directory
+    database_path = str(tmp_path_factory.mktemp('data') / 'components.db')
+    subprocess.run([sys.executable, DB_CREATOR_PATH, '--database', database_path], check=True, capture_output=True)
+    return database_path
+
+@pytest.mark.parametrize('query, params', list(QUERIES.values()), ids=list(QUERIES))
+def test_queries_use_indexes(database_path, query, params):
+    # Without ANALYZE statistics the planner assumes large tables - the plans are checked
+    # for the catalogues sizes they are meant for, not for the bundled sample data
+    conn = sqlite3.connect(database_path)
+    try:
+        plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params)]
+    finally:
+        conn.close()
+
+    # Full scans of the catalogue tables and sorting of the whole result before LIMIT
+    full_scans = [step for step in plan if step.startswith('SCAN') and step.split()[1] in ['Bearings', 'RollingElements'] and 'INDEX' not in step]
+    sorts = [step for step in plan if 'TEMP B-TREE' in step and 'LIMIT' in query]
+    assert not full_scans + sorts, f"the query does not use the indexes: {'; '.join(full_scans + sorts)}"
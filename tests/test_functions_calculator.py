@@ -0,0 +1,105 @@
+"""
+Regression tests of the shaft functions.
+
+data/functions_reference.npz holds the functions calculated by the FunctionsCalculator of the baseline
+commit 1e19439 - the one evaluating the loads at every z argument in Python loops - for the mechanisms
+of make_mechanism_data(n) with n = 1-4 eccentrics and the shaft steps of make_shaft_steps(..., 8).
+The moments and the minimal diameters by them have to match it exactly, the minimal diameters by the
+deflection within their rounding step, 0.01 mm - the deflection gets summed in a different order, so its
+values rounded up can land on the next step.
+"""
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from input_mechanism.model.input_mechanism_calculator import InputMechanismCalculator
+
+from shaft_designer.model.functions_calculator import FunctionsCalculator
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'functions_reference.npz')
+MOMENTS_FUNCTIONS = ['Mg', 'Ms', 'Mz', 'dMs', 'dMz', 'dqdop']
+DEFLECTION_MIN_DIAMETERS = ['dkdop', 'dfdop', 'dmin']
+ROUNDING = 0.01
+
+@pytest.fixture(scope='module')
+def reference():
+    with np.load(REFERENCE_PATH) as reference:
+        return dict(reference)
+
+def get_calculated_functions_calculator(data, shaft_steps, **kwargs):
+    functions_calculator = FunctionsCalculator(**kwargs)
+    functions_calculator.calculate_initial_functions_and_attributes(copy.deepcopy(data))
+    functions_calculator.calculate_remaining_functions(copy.deepcopy(shaft_steps))
+    return functions_calculator
+
+def get_functions(functions_calculator):
+    # Shaft functions by their keys, and the z arguments vector
+    shaft_functions = functions_calculator.get_shaft_functions()
+    return {'z': shaft_functions['z'], **{key: function['function'] for group in ('f(z)', 'dmin(z)') for key, function in shaft_functions[group].items()}}
+
+def assert_functions_equal(functions, expected):
+    np.testing.assert_array_equal(functions['z'], expected['z'])
+    for key in MOMENTS_FUNCTIONS:
+        np.testing.assert_array_equal(functions[key], expected[key], err_msg=key)
+    np.testing.assert_allclose(functions['f'], expected['f'], rtol=1e-9, atol=1e-12 * np.abs(expected['f']).max(), err_msg='f')
+    for key in DEFLECTION_MIN_DIAMETERS:
+        # Compare the rounding steps - the float differences of 0.01 exceed it by the representation error
+        steps_difference = np.abs(np.round(np.asarray(functions[key]) / ROUNDING) - np.round(np.asarray(expected[key]) / ROUNDING))
+        assert steps_difference.max() <= 1, f'{key} differs by {steps_difference.max() * ROUNDING:.2f} mm'
+
+@pytest.mark.parametrize('steps_number', [8])
+@pytest.mark.parametrize('incremental', [False, True], ids=['full', 'incremental'])
+def test_functions_match_reference(reference, eccentrics_number, mechanism_data, shaft_design, incremental):
+    _, shaft_steps = shaft_design
+    functions = get_functions(get_calculated_functions_calculator(mechanism_data, shaft_steps, incremental=incremental))
+    assert_functions_equal(functions, {key: reference[f'n={eccentrics_number}/{key}'] for key in functions})
+
+@pytest.mark.parametrize('steps_number', [8])
+def test_incremental_matches_full(mechanism_data, shaft_design):
+    _, shaft_steps = shaft_design
+    shaft_steps = copy.deepcopy(shaft_steps)
+    incremental_calculator = get_calculated_functions_calculator(mechanism_data, shaft_steps, incremental=True)
+
+    # Edit the steps from the shaft end to its start, like the shaft designer does, and then the same step twice
+    for step in [shaft_steps[-1], shaft_steps[len(shaft_steps) // 2], shaft_steps[0], shaft_steps[0]]:
+        step['d'] += 1
+        incremental_calculator.calculate_remaining_functions(copy.deepcopy(shaft_steps))
+        full_functions = get_functions(get_calculated_functions_calculator(mechanism_data, shaft_steps))
+        for key, function in get_functions(incremental_calculator).items():
+            np.testing.assert_array_equal(function, full_functions[key], err_msg=key)
+
+LOAD_CASES = [{},
+              {'Mwe': 600},
+              {'Fwzx': 6000, 'Fwzy': 1000},
+              {'Fwm': 2500, 'e': 4},
+              {'Mwe': 300, 'Fwzx': 3000, 'e': 2}]
+
+def make_load_case_data(mechanism_data, load_case):
+    # Input mechanism data with the load case values - the active forces get recalculated for them
+    calculator = InputMechanismCalculator()
+    data = calculator.get_data()
+    data.update(copy.deepcopy(mechanism_data))
+    for key, value in load_case.items():
+        data[key][0] = value
+    calculator.set_initial_data()
+    return data
+
+@pytest.mark.parametrize('steps_number', [8])
+def test_load_cases_match_single_runs(mechanism_data, shaft_design):
+    _, shaft_steps = shaft_design
+    load_cases = get_calculated_functions_calculator(mechanism_data, shaft_steps).calculate_load_cases(LOAD_CASES)
+
+    for idx, load_case in enumerate(LOAD_CASES):
+        data = make_load_case_data(mechanism_data, load_case)
+        # The eccentrics steps follow the eccentricity of the load case
+        steps = [dict(step, e=np.sign(step['e']) * data['e'][0]) for step in shaft_steps]
+        functions_calculator = get_calculated_functions_calculator(data, steps)
+        functions = get_functions(functions_calculator)
+        assert_functions_equal({key: load_cases[key] if key == 'z' else load_cases[key][idx] for key in functions}, functions)
+        shaft_attributes = functions_calculator.get_shaft_initial_attributes()
+        assert load_cases['dsc'][idx] == pytest.approx(shaft_attributes['ds'])
+        assert load_cases['dec'][idx] == pytest.approx(shaft_attributes['de'])
+
+    np.testing.assert_array_equal(load_cases['dmin_envelope'], load_cases['dmin'].max(axis=0))